@@ -0,0 +1,57 @@
+import threading
+import time
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+
+
+class ProcessLocalCache:
+    """
+    Keeps the value returned by `load` in process memory, for data that is
+    read on every request but rarely changes.
+
+    Each uwsgi worker has its own copy. `invalidate` drops the copy in this
+    process and changes a version in the shared cache, which other processes
+    compare their copy's version with. They only check it once every
+    `check_interval` seconds, `LOCAL_CACHE_CHECK_INTERVAL` by default, so most
+    requests don't touch the shared cache, at the cost of other processes
+    serving the old value for up to that long.
+    """
+
+    def __init__(self, name, load, check_interval=None):
+        self.version_cache_key = f"{name}:version"
+        self.load = load
+        if check_interval is None:
+            check_interval = getattr(settings, "LOCAL_CACHE_CHECK_INTERVAL", 5)
+        self.check_interval = check_interval
+        self._value = None
+        self._version = None
+        self._checked_at = None
+        self._lock = threading.Lock()
+
+    def get_version(self):
+        return cache.get_or_set(self.version_cache_key, lambda: uuid.uuid4().hex, None)
+
+    def get(self):
+        with self._lock:
+            now = time.monotonic()
+            if (
+                self._checked_at is None
+                or now - self._checked_at >= self.check_interval
+            ):
+                version = self.get_version()
+                if version != self._version:
+                    self._value = None
+                    self._version = version
+                self._checked_at = now
+
+            if self._value is None:
+                self._value = self.load()
+            return self._value
+
+    def invalidate(self):
+        with self._lock:
+            self._value = None
+            self._checked_at = None
+        cache.set(self.version_cache_key, uuid.uuid4().hex, None)
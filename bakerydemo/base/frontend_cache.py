@@ -0,0 +1,209 @@
+import atexit
+import logging
+import os
+import threading
+import time
+from itertools import batched
+from urllib.parse import urlsplit
+
+import requests
+from django.conf import settings
+from django.db import close_old_connections
+from django_tasks import task
+from wagtail.contrib.frontend_cache.backends import BaseBackend
+from wagtail.contrib.frontend_cache.backends import (
+    CloudflareBackend as BaseCloudflareBackend,
+)
+from wagtail.contrib.frontend_cache.utils import get_backends
+
+logger = logging.getLogger(__name__)
+
+
+class PurgeError(Exception):
+    pass
+
+
+def is_transient(error):
+    # Rate limits and server errors may succeed later, but other client
+    # errors, e.g. an invalid URL, won't
+    if isinstance(error, requests.HTTPError):
+        return error.response.status_code == 429 or error.response.status_code >= 500
+    return isinstance(error, requests.RequestException)
+
+
+def send_batch(backend_name, backend, urls):
+    """
+    Sends a batch of URLs to the backend, retrying if it fails with a
+    transient error. The delay before each retry doubles, starting from
+    `FRONTEND_CACHE_PURGE_BACKOFF` seconds.
+    """
+    retries = settings.FRONTEND_CACHE_PURGE_RETRIES
+    for attempt in range(retries + 1):
+        try:
+            backend.send_batch(urls)
+            return
+        except (PurgeError, requests.RequestException) as error:
+            if attempt == retries or not is_transient(error):
+                logger.exception(
+                    "[%s] Couldn't purge %d URLs: %s", backend_name, len(urls), urls
+                )
+                return
+            time.sleep(settings.FRONTEND_CACHE_PURGE_BACKOFF * 2**attempt)
+
+
+@task()
+def purge_urls_task(urls):
+    """
+    Purges the URLs from every queued backend that invalidates their
+    hostname, in batches of up to the backend's `batch_size` URLs.
+    """
+    for backend_name, backend in get_backends().items():
+        if not isinstance(backend, QueuedBackendMixin):
+            continue
+
+        backend_urls = [
+            url for url in urls if backend.invalidates_hostname(urlsplit(url).netloc)
+        ]
+        for batch in batched(backend_urls, backend.batch_size):
+            send_batch(backend_name, backend, list(batch))
+
+
+class PurgeQueue:
+    """
+    Collects the URLs to purge from the frontend cache in memory, without
+    duplicates, so that purging many pages, e.g. in a bulk publish, doesn't
+    make an API call per page on the request thread. The URLs are purged in
+    batches by `flush`, which a daemon thread calls every `flush_interval`
+    seconds, and once more when the process exits.
+
+    With no `flush_interval`, nothing is flushed automatically and `flush`
+    has to be called explicitly, e.g. in tests.
+    """
+
+    def __init__(self, flush_interval=None):
+        self.flush_interval = flush_interval
+        # A dict rather than a set, to purge URLs in the order they were added
+        self._urls = {}
+        self._lock = threading.Lock()
+        self._flusher_pid = None
+
+    def add_urls(self, urls):
+        with self._lock:
+            self._urls.update(dict.fromkeys(urls))
+
+        self._start_flusher()
+
+    def drain(self):
+        """Empties the queue, returning the URLs that were in it."""
+        with self._lock:
+            urls, self._urls = self._urls, {}
+        return list(urls)
+
+    def flush(self):
+        urls = self.drain()
+        if urls:
+            purge_urls_task.enqueue(urls)
+
+    def _start_flusher(self):
+        # Checking the process ID means each forked uwsgi worker gets its own
+        # flusher, as threads don't survive a fork
+        if not self.flush_interval or self._flusher_pid == os.getpid():
+            return
+
+        with self._lock:
+            if self._flusher_pid == os.getpid():
+                return
+            self._flusher_pid = os.getpid()
+
+        threading.Thread(target=self._run_flusher, daemon=True).start()
+        atexit.register(self.flush)
+
+    def _flush_in_background(self):
+        # Enqueuing the task may use the database, and nothing else closes
+        # this thread's connection if it goes stale, see `SearchHitBuffer`
+        close_old_connections()
+        try:
+            self.flush()
+        except Exception:
+            # Purged pages expire from the frontend cache eventually, so
+            # drop this batch rather than letting the flusher thread die
+            logger.exception("Failed to purge URLs from the frontend cache")
+        finally:
+            close_old_connections()
+
+    def _run_flusher(self):
+        while True:
+            time.sleep(self.flush_interval)
+            self._flush_in_background()
+
+
+purge_queue = PurgeQueue(
+    flush_interval=getattr(settings, "FRONTEND_CACHE_PURGE_INTERVAL", 5)
+)
+
+
+class QueuedBackendMixin:
+    """
+    Makes a frontend cache backend add the URLs Wagtail asks it to purge to
+    `purge_queue`, rather than purging them straight away. They're purged
+    later, up to `batch_size` at a time, which can be set with the
+    `BATCH_SIZE` option.
+
+    Backends must implement `send_batch(urls)`, which purges the URLs and
+    raises an exception if that fails, so that transient failures are retried.
+    """
+
+    batch_size = 30
+
+    def __init__(self, params):
+        self.batch_size = params.pop("BATCH_SIZE", self.batch_size)
+        super().__init__(params)
+
+    def purge(self, url):
+        purge_queue.add_urls([url])
+
+    def purge_batch(self, urls):
+        purge_queue.add_urls(urls)
+
+
+class CloudflareBackend(QueuedBackendMixin, BaseCloudflareBackend):
+    """
+    Wagtail's Cloudflare backend, queued. Unlike Wagtail's, it raises errors
+    rather than logging them, so that failed batches are retried.
+    """
+
+    # The most URLs Cloudflare accepts in one purge call on most plans
+    batch_size = BaseCloudflareBackend.CHUNK_SIZE
+
+    def send_batch(self, urls):
+        if self.cloudflare_token:
+            headers = {"Authorization": f"Bearer {self.cloudflare_token}"}
+        else:
+            headers = {
+                "X-Auth-Email": self.cloudflare_email,
+                "X-Auth-Key": self.cloudflare_api_key,
+            }
+
+        response = requests.post(
+            self.cloudflare_purge_endpoint_url,
+            json={"files": urls},
+            headers=headers,
+            timeout=30,
+        )
+        response.raise_for_status()
+
+        response_json = response.json()
+        if not response_json["success"]:
+            raise PurgeError(
+                ", ".join(str(error["message"]) for error in response_json["errors"])
+            )
+
+
+class StubBackend(QueuedBackendMixin, BaseBackend):
+    """
+    A queued backend that purges nothing, but logs each batch it's sent, to
+    try out purging offline.
+    """
+
+    def send_batch(self, urls):
+        logger.info("Purging %d URLs: %s", len(urls), urls)
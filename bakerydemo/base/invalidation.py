@@ -0,0 +1,141 @@
+from collections import defaultdict
+from functools import reduce
+from operator import or_
+
+from django.apps import apps
+from django.contrib.contenttypes.models import ContentType
+from django.db.models import Q
+from wagtail.documents.models import AbstractDocument
+from wagtail.images.models import AbstractImage
+from wagtail.models import DraftStateMixin, Page, ReferenceIndex
+from wagtail.snippets.models import get_snippet_models
+
+from . import page_cache
+
+# How many references away from the changed object to look for dependent
+# pages, e.g. an image used by a person who is the author of a blog post that
+# is featured on the home page is three references away
+MAX_DEPTH = 3
+
+
+def is_saved_dependency(model):
+    """
+    Whether the model's instances are shown on pages as soon as they're saved,
+    rather than when they're published.
+    """
+    return not issubclass(model, DraftStateMixin) and (
+        issubclass(model, (AbstractImage, AbstractDocument))
+        or model in get_snippet_models()
+    )
+
+
+def get_base_content_type(obj):
+    # The reference index refers to objects by the content type of their base
+    # model, e.g. `Page` for every page
+    parents = obj._meta.get_parent_list()
+    return ContentType.objects.get_for_model(
+        parents[-1] if parents else obj, for_concrete_model=False
+    )
+
+
+def get_parent_page_ids(page_ids):
+    paths = Page.objects.filter(pk__in=page_ids).values_list("path", flat=True)
+    return {
+        str(pk)
+        for pk in Page.objects.filter(
+            path__in=[path[: -Page.steplen] for path in paths], depth__gt=1
+        ).values_list("pk", flat=True)
+    }
+
+
+def get_referencing_objects(objects):
+    """
+    Returns the objects that reference any of the given objects, as
+    `(base_content_type_id, object_id)` pairs, in one query.
+    """
+    object_ids = defaultdict(set)
+    for content_type_id, object_id in objects:
+        object_ids[content_type_id].add(object_id)
+
+    return set(
+        ReferenceIndex.objects.filter(
+            reduce(
+                or_,
+                [
+                    Q(to_content_type_id=content_type_id, to_object_id__in=ids)
+                    for content_type_id, ids in object_ids.items()
+                ],
+            )
+        ).values_list("base_content_type_id", "object_id")
+    )
+
+
+def get_dependent_page_ids(obj, max_depth=MAX_DEPTH):
+    """
+    Returns the IDs of the pages whose content depends on the object, found by
+    walking Wagtail's reference index outwards from it. The walk follows:
+
+    * every object that references it, e.g. the pages and snippets that use an
+      image, and the objects that reference those in turn
+    * the parent of each page, as index pages list their children
+
+    This includes the object itself if it's a page.
+    """
+    page_content_type_id = ContentType.objects.get_for_model(Page).pk
+
+    page_ids = set()
+    seen = set()
+    to_visit = {(get_base_content_type(obj).pk, str(obj.pk))}
+    # Pages that were only found as the parent of another page. Their parent
+    # doesn't list that page, so it isn't followed.
+    parents_only = set()
+
+    for depth in range(max_depth + 1):
+        to_visit -= seen
+        if not to_visit:
+            break
+        seen |= to_visit
+
+        visiting_page_ids = {
+            object_id
+            for content_type_id, object_id in to_visit
+            if content_type_id == page_content_type_id
+        }
+        page_ids |= visiting_page_ids
+        if depth == max_depth:
+            break
+
+        references = get_referencing_objects(to_visit)
+        parents = get_parent_page_ids(visiting_page_ids - parents_only)
+        parents_only = parents - {
+            object_id
+            for content_type_id, object_id in references
+            if content_type_id == page_content_type_id
+        }
+        to_visit = references | {
+            (page_content_type_id, parent_id) for parent_id in parents
+        }
+
+    return {int(page_id) for page_id in page_ids}
+
+
+def invalidate_dependents(obj):
+    """
+    Purges every page that depends on the object from the page cache, which
+    also invalidates fragments cached by page version, and from the frontend
+    cache if there is one.
+    """
+    page_ids = get_dependent_page_ids(obj)
+    if not page_ids:
+        return
+
+    page_cache.purge_pages(*page_ids)
+
+    if apps.is_installed("wagtail.contrib.frontend_cache"):
+        from wagtail.contrib.frontend_cache.utils import purge_pages_from_cache
+
+        # Wagtail's frontend cache app already purges pages when they're
+        # published or unpublished
+        if isinstance(obj, Page):
+            page_ids.discard(obj.pk)
+        purge_pages_from_cache(Page.objects.filter(pk__in=page_ids).specific())
@@ -2,6 +2,7 @@ import random
 from pathlib import Path
 
 from django.conf import settings
+from django.core.files.images import ImageFile
 from django.core.management.base import BaseCommand
 from django.utils import lorem_ipsum, timezone
 from django.utils.text import slugify
@@ -167,7 +168,7 @@ class Command(BaseCommand):
                     file_size=random_image.stat().st_size,
                 )
                 image_file.seek(0)
-                image.file.save(random_image.name, image_file)
+                image.file.save(random_image.name, ImageFile(image_file))
 
     def handle(self, **options):
         self.create_images(options["image_count"])
@@ -40,6 +40,7 @@ class Command(BaseCommand):
         call_command("loaddata", fixture_file, verbosity=0)
         call_command("update_index", verbosity=0)
         call_command("rebuild_references_index", verbosity=0)
+        call_command("update_search_facets", verbosity=0)
 
         print(  # noqa: T201
             "Awesome. Your data is loaded! The bakery's doors are almost ready to open..."
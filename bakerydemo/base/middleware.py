@@ -0,0 +1,82 @@
+from wagtail.models import Page
+
+from . import page_cache
+from .navigation import get_site_for_request
+
+
+class SiteMiddleware:
+    """
+    Resolves the site for each request from the sites kept in memory, before
+    Wagtail or the redirects middleware would look it up with a query. Wagtail
+    reuses the site stored on the request by `get_site_for_request`.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        get_site_for_request(request)
+        return self.get_response(request)
+
+
+class PageCacheMiddleware:
+    """
+    Caches whole Wagtail pages for anonymous visitors, so that repeat visits
+    skip the view and template rendering entirely. Responses are keyed on the
+    URL, the active language and the image formats the browser accepts, and
+    are purged when their page, its children or a page it references change.
+    See bakerydemo/base/page_cache.py
+
+    This is opt-in with the PAGE_CACHE_ENABLED environment variable.
+
+    It runs inside the session and messages middleware, as it needs
+    `request.user`, so it doesn't see the cookies they add to the response.
+    Responses that showed or added messages, or changed the session, are
+    specific to the visitor and aren't cached.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def is_cacheable_request(self, request):
+        return (
+            request.method in ("GET", "HEAD")
+            and not request.user.is_authenticated
+            and not getattr(request, "is_preview", False)
+        )
+
+    def has_visitor_state(self, request):
+        messages = getattr(request, "_messages", None)
+        session = getattr(request, "session", None)
+        return bool(
+            (messages is not None and (messages.used or messages._queued_messages))
+            or (session is not None and session.modified)
+        )
+
+    def is_cacheable_response(self, request, response):
+        return (
+            response.status_code == 200
+            and not self.has_visitor_state(request)
+            and not response.streaming
+            and not response.cookies
+            and not response.has_header("Vary")
+            and "private" not in response.get("Cache-Control", "")
+            # Pages with forms include a CSRF token, which mustn't be shared
+            and not request.META.get("CSRF_COOKIE_NEEDS_UPDATE")
+        )
+
+    def __call__(self, request):
+        if not self.is_cacheable_request(request):
+            return self.get_response(request)
+
+        response = page_cache.get_cached_response(request)
+        if response is not None:
+            return response
+
+        response = self.get_response(request)
+
+        # Only Wagtail pages are cached, as they are what gets purged
+        page = (getattr(response, "context_data", None) or {}).get("page")
+        if isinstance(page, Page) and self.is_cacheable_response(request, response):
+            page_cache.cache_response(request, page, response)
+        return response
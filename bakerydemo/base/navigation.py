@@ -0,0 +1,225 @@
+import uuid
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http.request import split_domain_port
+from django.utils import translation
+from wagtail.coreutils import get_supported_content_language_variant
+from wagtail.models import Page, Site
+from wagtail.templatetags.wagtailcore_tags import richtext
+
+from .cache import ProcessLocalCache
+from .models import FooterText
+
+# Bumped whenever the page tree, the footer text or the sites change. It's part
+# of the key of the header, breadcrumbs and footer fragments cached in
+# base.html, so bumping it invalidates all of them at once.
+VERSION_CACHE_KEY = "navigation:version"
+
+
+def get_version(request=None):
+    # Remembered on the request, so a page reading it for several fragments
+    # and URLs only fetches it once
+    if request is not None and hasattr(request, "_navigation_version"):
+        return request._navigation_version
+    version = cache.get_or_set(VERSION_CACHE_KEY, lambda: uuid.uuid4().hex, None)
+    if request is not None:
+        request._navigation_version = version
+    return version
+
+
+def bump_version():
+    # A new random version, rather than an incremented one, can't collide with
+    # a version that was evicted from the cache
+    cache.set(VERSION_CACHE_KEY, uuid.uuid4().hex, None)
+
+
+def load_sites():
+    """
+    Fetches every site, with its root page, in one query. Returns the sites
+    keyed by hostname, and the default site.
+    """
+    sites_by_hostname = defaultdict(list)
+    default_site = None
+    for site in Site.objects.select_related("root_page"):
+        sites_by_hostname[site.hostname].append(site)
+        if site.is_default_site:
+            default_site = site
+    return dict(sites_by_hostname), default_site
+
+
+# Sites are looked up on every request but rarely edited, so each process
+# keeps them in memory until a site is saved or deleted
+sites_cache = ProcessLocalCache("navigation:sites", load_sites)
+
+
+def find_site(hostname, port):
+    """
+    Returns the site for the given hostname and port, matching sites the same
+    way as `Site.find_for_request`, but without a query.
+    """
+    sites_by_hostname, default_site = sites_cache.get()
+    sites = sites_by_hostname.get(hostname, [])
+    for site in sites:
+        if site.port == port:
+            return site
+    for site in sites:
+        if site.is_default_site:
+            return site
+    if len(sites) == 1:
+        return sites[0]
+    return default_site
+
+
+def get_site_for_request(request):
+    """
+    Returns the site for the request, and stores it where
+    `Site.find_for_request` caches it, so that Wagtail reuses it too for the
+    rest of the request, e.g. when working out page URLs.
+    """
+    if not hasattr(request, "_wagtail_site"):
+        # Like Wagtail, use `_get_raw_host` to avoid ALLOWED_HOSTS checks
+        hostname = split_domain_port(request._get_raw_host())[0]
+        # `Site.port` is an integer, while the request's port is a string
+        try:
+            port = int(request.get_port())
+        except ValueError:
+            port = None
+        request._wagtail_site = find_site(hostname, port)
+    return request._wagtail_site
+
+
+def get_menu_cache_key(parent_id):
+    return f"navigation:menu:{parent_id}"
+
+
+def get_menu_items(parent, request=None):
+    """
+    Returns the live, in-menu children of `parent` as a list of dicts with
+    their ID, title, URL and URL path, all fetched in one query. These don't
+    depend on the current page, so they are cached until one of the children
+    is published, unpublished or moved. Translations of a site root are
+    separate pages, so this caches one menu per site root and locale.
+    """
+    cache_key = get_menu_cache_key(parent.pk)
+    menuitems = cache.get(cache_key)
+
+    if menuitems is None:
+        menuitems = [
+            {
+                "id": page.pk,
+                "title": page.title,
+                "url": page.get_url(request),
+                "url_path": page.url_path,
+            }
+            for page in parent.get_children().live().in_menu()
+        ]
+        cache.set(cache_key, menuitems, None)
+
+    return menuitems
+
+
+def is_in_cached_menus(page_id, parent_ids):
+    menus = cache.get_many([get_menu_cache_key(parent_id) for parent_id in parent_ids])
+    return any(
+        menuitem["id"] == page_id for menu in menus.values() for menuitem in menu
+    )
+
+
+def invalidate_menus(*parent_ids):
+    cache.delete_many([get_menu_cache_key(parent_id) for parent_id in parent_ids])
+
+
+def get_breadcrumb_cache_key(site_id, path):
+    return f"navigation:breadcrumb:{site_id}:{path}"
+
+
+def get_ancestor_paths(page):
+    """
+    Returns the treebeard paths of the page and its ancestors, from the top,
+    excluding the tree root. Each ancestor's path is a prefix of the page's.
+    """
+    return [
+        page.path[:end]
+        for end in range(Page.steplen * 2, len(page.path) + 1, Page.steplen)
+    ]
+
+
+def get_breadcrumbs(page, request):
+    """
+    Returns the title and URL of the page and each of its ancestors, excluding
+    the tree root, as a list of dicts. They're cached per site and path, so
+    breadcrumbs only query the pages that haven't been seen before, and make
+    no queries once every ancestor is cached.
+    """
+    site = get_site_for_request(request)
+    site_id = site.pk if site else None
+    paths = get_ancestor_paths(page)
+    keys = {path: get_breadcrumb_cache_key(site_id, path) for path in paths}
+    cached = cache.get_many(keys.values())
+
+    missing = [path for path in paths if keys[path] not in cached]
+    if missing:
+        fetched = {
+            keys[ancestor.path]: {
+                "title": ancestor.title,
+                "url": ancestor.get_url(request),
+            }
+            for ancestor in Page.objects.filter(path__in=missing)
+        }
+        cache.set_many(fetched, None)
+        cached.update(fetched)
+
+    return [cached[keys[path]] for path in paths if keys[path] in cached]
+
+
+def invalidate_breadcrumbs(*paths):
+    # Breadcrumbs are cached per site, and the sites are already in memory
+    sites_by_hostname, _ = sites_cache.get()
+    site_ids = [site.pk for sites in sites_by_hostname.values() for site in sites]
+    site_ids.append(None)
+    cache.delete_many(
+        [
+            get_breadcrumb_cache_key(site_id, path)
+            for site_id in site_ids
+            for path in paths
+        ]
+    )
+
+
+def load_footer_html():
+    """
+    Renders the body of the live footer text in each locale, keyed by language
+    code, in one query.
+    """
+    footer_html = {}
+    for footer_text in (
+        FooterText.objects.filter(live=True).select_related("locale").order_by("pk")
+    ):
+        footer_html.setdefault(
+            footer_text.locale.language_code, richtext(footer_text.body)
+        )
+    return footer_html
+
+
+# The footer is rendered on every page but rarely edited, so each process
+# keeps it in memory until a footer text is published or unpublished
+footer_html_cache = ProcessLocalCache("navigation:footer_html", load_footer_html)
+
+
+def get_footer_html():
+    """
+    Returns the footer text in the active language, falling back to the one in
+    the default language, then to any live footer text. This resolves the
+    locale like `Locale.get_active`, but from settings rather than a query.
+    """
+    footer_html = footer_html_cache.get()
+    for language_code in (translation.get_language(), settings.LANGUAGE_CODE):
+        try:
+            language_code = get_supported_content_language_variant(language_code)
+        except LookupError:
+            continue
+        if language_code in footer_html:
+            return footer_html[language_code]
+    return next(iter(footer_html.values()), "")
@@ -0,0 +1,100 @@
+import hashlib
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import translation
+
+from . import navigation
+
+# The image formats that browsers say they accept. Rather than the whole
+# `Accept` header, only which of these it includes is part of the cache key.
+NEGOTIATED_IMAGE_FORMATS = ("image/avif", "image/webp")
+
+
+def get_cache_key(request):
+    accept = request.headers.get("Accept", "")
+    key = "|".join(
+        [
+            request.build_absolute_uri(),
+            translation.get_language() or "",
+            *[
+                image_format
+                for image_format in NEGOTIATED_IMAGE_FORMATS
+                if image_format in accept
+            ],
+        ]
+    )
+    return f"page_cache:{hashlib.md5(key.encode()).hexdigest()}"
+
+
+def get_page_version_cache_key(page_id):
+    return f"page_cache:page_version:{page_id}"
+
+
+def get_page_version(page_id):
+    return cache.get_or_set(
+        get_page_version_cache_key(page_id), lambda: uuid.uuid4().hex, None
+    )
+
+
+def get_page_versions(page_ids):
+    """
+    Returns the versions of the pages, keyed by page ID, in one round trip,
+    setting those that aren't in the cache yet.
+    """
+    cache_keys = {page_id: get_page_version_cache_key(page_id) for page_id in page_ids}
+    versions = cache.get_many(cache_keys.values())
+    missing = {
+        cache_key: uuid.uuid4().hex
+        for cache_key in cache_keys.values()
+        if cache_key not in versions
+    }
+    if missing:
+        cache.set_many(missing, None)
+        versions.update(missing)
+    return {page_id: versions[cache_key] for page_id, cache_key in cache_keys.items()}
+
+
+def get_cached_response(request):
+    """
+    Returns the cached response for the request, unless its page has been
+    purged, or the navigation changed, since it was cached.
+    """
+    entry = cache.get(get_cache_key(request))
+    if entry is None:
+        return None
+
+    # Both versions are read in one round trip
+    page_version_cache_key = get_page_version_cache_key(entry["page_id"])
+    versions = cache.get_many([page_version_cache_key, navigation.VERSION_CACHE_KEY])
+    if (
+        versions.get(page_version_cache_key) != entry["page_version"]
+        or versions.get(navigation.VERSION_CACHE_KEY) != entry["navigation_version"]
+    ):
+        return None
+    return entry["response"]
+
+
+def cache_response(request, page, response):
+    cache.set(
+        get_cache_key(request),
+        {
+            "page_id": page.pk,
+            "page_version": get_page_version(page.pk),
+            "navigation_version": navigation.get_version(),
+            "response": response,
+        },
+        settings.PAGE_CACHE_TIMEOUT,
+    )
+
+
+def purge_pages(*page_ids):
+    """
+    Purges every cached response of the given pages, whatever its URL, by
+    changing the pages' versions.
+    """
+    cache.set_many(
+        {get_page_version_cache_key(page_id): uuid.uuid4().hex for page_id in page_ids},
+        None,
+    )
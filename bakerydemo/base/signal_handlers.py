@@ -0,0 +1,139 @@
+from django.db.models.signals import post_delete, post_save
+from wagtail.models import Page, Site
+from wagtail.signals import (
+    page_published,
+    page_slug_changed,
+    page_unpublished,
+    post_page_move,
+    pre_page_move,
+    published,
+    unpublished,
+)
+
+from . import invalidation, navigation
+from .models import FooterText, GenericSettings
+
+
+def get_subtree(page, inclusive=True):
+    return dict(
+        Page.objects.descendant_of(page, inclusive=inclusive).values_list("pk", "path")
+    )
+
+
+def get_menu_parent_ids(*pages):
+    """Returns the IDs of the pages' parents, whose menus list the pages."""
+    paths = [page.path[: -Page.steplen] for page in pages]
+    return Page.objects.filter(path__in=paths).values_list("pk", flat=True)
+
+
+def invalidate_page_navigation(instance, **kwargs):
+    # A page's title, or whether it's live or in menus, may have changed
+    menu_parent_ids = list(get_menu_parent_ids(instance))
+
+    # Other pages only show this one in their navigation if it's in a menu,
+    # now or when the menu was cached, or in their breadcrumbs. Otherwise only
+    # the page's own header and breadcrumbs change, and they're cached by the
+    # page's `cache_key`, which changes when it's published.
+    in_navigation = (
+        instance.show_in_menus
+        or instance.numchild
+        or navigation.is_in_cached_menus(instance.pk, menu_parent_ids)
+    )
+
+    navigation.invalidate_menus(*menu_parent_ids)
+    navigation.invalidate_breadcrumbs(instance.path)
+    if in_navigation:
+        navigation.bump_version()
+
+
+def invalidate_published_dependents(instance, **kwargs):
+    # Pages and snippets with drafts only change on the site when they're
+    # published or unpublished
+    invalidation.invalidate_dependents(instance)
+
+
+def invalidate_saved_dependents(sender, instance, **kwargs):
+    # Fixtures, e.g. the initial data, are loaded without any cached pages to
+    # purge, and before the reference index is rebuilt
+    if kwargs.get("raw"):
+        return
+
+    # Images, documents and snippets without drafts change as soon as they're
+    # saved or deleted
+    if invalidation.is_saved_dependency(sender):
+        invalidation.invalidate_dependents(instance)
+
+
+def invalidate_subtree_navigation(instance, **kwargs):
+    # The URLs of the page and all its descendants changed, so any menu of
+    # their children, and their breadcrumbs, are out of date too
+    subtree = get_subtree(instance)
+    navigation.invalidate_menus(*subtree.keys())
+    navigation.invalidate_breadcrumbs(*subtree.values())
+    navigation.bump_version()
+
+
+def invalidate_moving_page_breadcrumbs(instance, **kwargs):
+    # The subtree's current paths are about to be vacated, or taken by other
+    # pages
+    navigation.invalidate_breadcrumbs(*get_subtree(instance).values())
+
+
+def invalidate_moved_page_navigation(
+    instance, parent_page_before, parent_page_after, **kwargs
+):
+    navigation.invalidate_menus(
+        parent_page_before.pk,
+        parent_page_after.pk,
+        *get_subtree(instance).keys(),
+    )
+    # The moved pages have new paths. Moving a page between siblings also
+    # shifts the paths of the siblings after it, and of their descendants,
+    # while pages before it keep theirs.
+    navigation.invalidate_breadcrumbs(
+        *Page.objects.descendant_of(parent_page_after)
+        .filter(path__gte=instance.path)
+        .values_list("path", flat=True)
+    )
+    navigation.bump_version()
+
+
+def invalidate_footer_html(**kwargs):
+    navigation.footer_html_cache.invalidate()
+    navigation.bump_version()
+
+
+def invalidate_sites(**kwargs):
+    navigation.sites_cache.invalidate()
+    navigation.bump_version()
+
+
+def invalidate_generic_settings(created, **kwargs):
+    # Settings are created, empty, the first time they're used, which doesn't
+    # change what was rendered
+    if not created:
+        navigation.bump_version()
+
+
+def register_signal_handlers():
+    page_published.connect(invalidate_page_navigation)
+    page_unpublished.connect(invalidate_page_navigation)
+    page_slug_changed.connect(invalidate_subtree_navigation)
+    pre_page_move.connect(invalidate_moving_page_breadcrumbs)
+    post_page_move.connect(invalidate_moved_page_navigation)
+
+    published.connect(invalidate_footer_html, sender=FooterText)
+    unpublished.connect(invalidate_footer_html, sender=FooterText)
+    post_delete.connect(invalidate_footer_html, sender=FooterText)
+
+    # The footer shows the social links from the generic settings
+    post_save.connect(invalidate_generic_settings, sender=GenericSettings)
+
+    # Purges the cached pages that depend on the changed object
+    published.connect(invalidate_published_dependents)
+    unpublished.connect(invalidate_published_dependents)
+    post_save.connect(invalidate_saved_dependents)
+    post_delete.connect(invalidate_saved_dependents)
+
+    post_save.connect(invalidate_sites, sender=Site)
+    post_delete.connect(invalidate_sites, sender=Site)
@@ -1,23 +1,39 @@
 from django import template
-from wagtail.models import Page, Site
+from wagtail.templatetags.wagtailcore_tags import richtext
 
-from bakerydemo.base.models import FooterText
+from bakerydemo.base import page_cache
+from bakerydemo.base.navigation import (
+    get_breadcrumbs,
+    get_footer_html,
+    get_menu_items,
+    get_site_for_request,
+    get_version,
+)
 
 register = template.Library()
 # https://docs.djangoproject.com/en/stable/howto/custom-template-tags/
 
 
+@register.simple_tag(takes_context=True)
+def get_navigation_version(context):
+    # Varies the cached header, breadcrumbs and footer in base.html
+    return get_version(context.get("request"))
+
+
+@register.simple_tag
+def get_page_version(page):
+    # Varies fragments cached within a page, so that they're purged along with
+    # the page when anything it depends on changes
+    return page_cache.get_page_version(page.pk)
+
+
 @register.simple_tag(takes_context=True)
 def get_site_root(context):
     # This returns a core.Page. The main menu needs to have the site.root_page
     # defined else will return an object attribute error ('str' object has no
-    # attribute 'get_children')
-    return Site.find_for_request(context["request"]).root_page
-
-
-def has_children(page):
-    # Generically allow index pages to list their children
-    return page.get_children().live().exists()
+    # attribute 'get_children'). The sites and their root pages are kept in
+    # memory, and the site is stored on the request for later tags to reuse.
+    return get_site_for_request(context["request"]).root_page
 
 
 def is_active(page, current_page):
@@ -28,20 +44,24 @@ def is_active(page, current_page):
 # Retrieves the top menu items - the immediate children of the parent page
 @register.inclusion_tag("tags/top_menu.html", takes_context=True)
 def top_menu(context, parent, calling_page=None):
-    menuitems = parent.get_children().live().in_menu()
-    for menuitem in menuitems:
-        # We don't directly check if calling_page is None since the template
-        # engine can pass an empty string to calling_page
-        # if the variable passed as calling_page does not exist.
-        menuitem.active = (
-            calling_page.url_path.startswith(menuitem.url_path)
-            if calling_page
-            else False
-        )
+    # The menu items are cached, so the active state is set on copies of them
+    menuitems = [
+        {
+            **menuitem,
+            # We don't directly check if calling_page is None since the template
+            # engine can pass an empty string to calling_page
+            # if the variable passed as calling_page does not exist.
+            "active": (
+                calling_page.url_path.startswith(menuitem["url_path"])
+                if calling_page
+                else False
+            ),
+        }
+        for menuitem in get_menu_items(parent, context["request"])
+    ]
     return {
         "calling_page": calling_page,
         "menuitems": menuitems,
-        # required by the pageurl tag that we want to use within this template
         "request": context["request"],
     }
 
@@ -53,7 +73,7 @@ def breadcrumbs(context):
         # When on the home page, displaying breadcrumbs is irrelevant.
         ancestors = ()
     else:
-        ancestors = Page.objects.ancestor_of(self, inclusive=True).filter(depth__gt=1)
+        ancestors = get_breadcrumbs(self, context["request"])
     return {
         "ancestors": ancestors,
         "request": context["request"],
@@ -67,11 +87,13 @@ def get_footer_text(context):
     # or page types that need a custom footer
     footer_text = context.get("footer_text", "")
 
-    # If the context doesn't have footer_text defined, get one that's live
-    if not footer_text:
-        instance = FooterText.objects.filter(live=True).first()
-        footer_text = instance.body if instance else ""
+    # If the context doesn't have footer_text defined, use the live one, which
+    # is rendered once and kept in memory
+    if footer_text:
+        footer_html = richtext(footer_text)
+    else:
+        footer_html = get_footer_html()
 
     return {
-        "footer_text": footer_text,
+        "footer_html": footer_html,
     }
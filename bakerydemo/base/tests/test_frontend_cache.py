@@ -0,0 +1,99 @@
+import requests
+from django.test import SimpleTestCase, override_settings
+from wagtail.contrib.frontend_cache.utils import purge_urls_from_cache
+
+from bakerydemo.base.frontend_cache import StubBackend, purge_queue
+
+
+class RecordingBackend(StubBackend):
+    sent_batches = []
+
+    def send_batch(self, urls):
+        super().send_batch(urls)
+        self.sent_batches.append(urls)
+
+
+class FlakyBackend(RecordingBackend):
+    failures = []
+
+    def send_batch(self, urls):
+        if self.failures:
+            raise self.failures.pop(0)
+        super().send_batch(urls)
+
+
+@override_settings(
+    WAGTAILFRONTENDCACHE={
+        "default": {
+            "BACKEND": "bakerydemo.base.tests.test_frontend_cache.RecordingBackend",
+            "BATCH_SIZE": 2,
+        }
+    }
+)
+class PurgeQueueTest(SimpleTestCase):
+    def setUp(self):
+        purge_queue.drain()
+        RecordingBackend.sent_batches.clear()
+
+    def test_urls_are_purged_in_batches_when_the_queue_is_flushed(self):
+        purge_urls_from_cache(["http://localhost/a/", "http://localhost/b/"])
+        purge_urls_from_cache(["http://localhost/c/"])
+        self.assertEqual(RecordingBackend.sent_batches, [])
+
+        purge_queue.flush()
+
+        self.assertEqual(
+            RecordingBackend.sent_batches,
+            [["http://localhost/a/", "http://localhost/b/"], ["http://localhost/c/"]],
+        )
+
+    def test_urls_are_purged_once(self):
+        purge_urls_from_cache(["http://localhost/a/", "http://localhost/b/"])
+        purge_urls_from_cache(["http://localhost/a/"])
+
+        purge_queue.flush()
+        purge_queue.flush()
+
+        self.assertEqual(
+            RecordingBackend.sent_batches,
+            [["http://localhost/a/", "http://localhost/b/"]],
+        )
+
+    @override_settings(
+        WAGTAILFRONTENDCACHE={
+            "default": {
+                "BACKEND": "bakerydemo.base.tests.test_frontend_cache.FlakyBackend"
+            }
+        }
+    )
+    def test_transient_failures_are_retried(self):
+        FlakyBackend.failures = [
+            requests.ConnectionError(),
+            requests.HTTPError(response=self.make_response(503)),
+        ]
+        purge_urls_from_cache(["http://localhost/a/"])
+
+        purge_queue.flush()
+
+        self.assertEqual(RecordingBackend.sent_batches, [["http://localhost/a/"]])
+
+    @override_settings(
+        WAGTAILFRONTENDCACHE={
+            "default": {
+                "BACKEND": "bakerydemo.base.tests.test_frontend_cache.FlakyBackend"
+            }
+        }
+    )
+    def test_other_failures_are_not_retried(self):
+        FlakyBackend.failures = [requests.HTTPError(response=self.make_response(400))]
+        purge_urls_from_cache(["http://localhost/a/"])
+
+        with self.assertLogs("bakerydemo.base.frontend_cache", "ERROR"):
+            purge_queue.flush()
+
+        self.assertEqual(RecordingBackend.sent_batches, [])
+
+    def make_response(self, status_code):
+        response = requests.Response()
+        response.status_code = status_code
+        return response
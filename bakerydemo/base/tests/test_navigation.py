@@ -0,0 +1,334 @@
+from django.core.cache import cache
+from django.template import Context, Template
+from django.test import RequestFactory, TestCase
+from django.utils import translation
+from wagtail.models import Locale, Page, Site
+
+from bakerydemo.base.models import FooterText, HomePage, StandardPage
+from bakerydemo.base.navigation import get_site_for_request
+
+
+class TopMenuTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        root = Page.get_first_root_node()
+        Site.objects.create(hostname="testserver", root_page=root, is_default_site=True)
+
+        cls.home = root.add_child(
+            instance=HomePage(
+                title="Home", slug="test-home", hero_text="Hi", hero_cta="Go"
+            )
+        )
+        cls.about = cls.home.add_child(
+            instance=StandardPage(title="About", slug="about", show_in_menus=True)
+        )
+        cls.team = cls.about.add_child(
+            instance=StandardPage(title="Team", slug="team", show_in_menus=True)
+        )
+        cls.home.add_child(
+            instance=StandardPage(title="Hidden", slug="hidden", show_in_menus=False)
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.request = RequestFactory().get("/")
+
+    def render_menu(self, parent=None, calling_page=None):
+        return Template(
+            "{% load navigation_tags %}"
+            "{% top_menu parent=parent calling_page=calling_page %}"
+        ).render(
+            Context(
+                {
+                    "request": self.request,
+                    "parent": parent or self.home,
+                    "calling_page": calling_page,
+                }
+            )
+        )
+
+    def test_menu_lists_live_pages_in_menus(self):
+        html = self.render_menu()
+
+        self.assertIn('href="/test-home/about/"', html)
+        self.assertNotIn("Hidden", html)
+        self.assertNotIn("Team", html)
+        self.assertNotIn("active", html)
+
+    def test_menu_is_cached_and_marks_active_items(self):
+        self.render_menu()
+
+        with self.assertNumQueries(0):
+            html = self.render_menu(calling_page=self.team)
+
+        self.assertIn('class="presentation about active"', html)
+
+    def test_menu_is_invalidated_on_publish_and_unpublish(self):
+        self.render_menu()
+
+        self.about.title = "About us"
+        self.about.save_revision().publish()
+        self.assertIn("About us", self.render_menu())
+
+        self.about.unpublish()
+        self.assertNotIn("About us", self.render_menu())
+
+    def test_menu_is_invalidated_on_move(self):
+        self.render_menu()
+        self.render_menu(parent=self.about)
+
+        self.team.move(self.home, pos="last-child")
+
+        self.assertIn("Team", self.render_menu())
+        self.assertNotIn("Team", self.render_menu(parent=self.about))
+
+
+class BreadcrumbsTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        root = Page.get_first_root_node()
+        Site.objects.create(hostname="testserver", root_page=root, is_default_site=True)
+
+        cls.home = root.add_child(
+            instance=HomePage(
+                title="Home", slug="test-home", hero_text="Hi", hero_cta="Go"
+            )
+        )
+        cls.about = cls.home.add_child(
+            instance=StandardPage(title="About", slug="about")
+        )
+        cls.team = cls.about.add_child(instance=StandardPage(title="Team", slug="team"))
+        cls.contact = cls.home.add_child(
+            instance=StandardPage(title="Contact", slug="contact")
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.request = RequestFactory().get("/")
+
+    def render_breadcrumbs(self, page):
+        return Template("{% load navigation_tags %}{% breadcrumbs %}").render(
+            Context({"request": self.request, "self": page})
+        )
+
+    def test_breadcrumbs_list_ancestors(self):
+        html = self.render_breadcrumbs(self.team)
+
+        self.assertIn('<a href="/test-home/">Home</a>', html)
+        self.assertIn('<a href="/test-home/about/">About</a>', html)
+        self.assertIn('<li aria-current="page">Team</li>', html)
+
+    def test_breadcrumbs_are_cached(self):
+        self.render_breadcrumbs(self.team)
+
+        with self.assertNumQueries(0):
+            self.render_breadcrumbs(self.team)
+
+        # Only the page that hasn't been seen before is queried
+        history = self.about.add_child(
+            instance=StandardPage(title="History", slug="history")
+        )
+        with self.assertNumQueries(1):
+            self.render_breadcrumbs(history)
+
+    def test_breadcrumbs_are_updated_on_rename(self):
+        self.render_breadcrumbs(self.team)
+
+        self.about.title = "About us"
+        self.about.save_revision().publish()
+
+        self.assertIn(">About us</a>", self.render_breadcrumbs(self.team))
+
+    def test_breadcrumbs_are_updated_on_move(self):
+        self.render_breadcrumbs(self.team)
+        self.render_breadcrumbs(self.contact)
+
+        self.team.move(self.contact, pos="last-child")
+        self.team.refresh_from_db()
+
+        html = self.render_breadcrumbs(self.team)
+        self.assertIn('<a href="/test-home/contact/">Contact</a>', html)
+        self.assertNotIn("About", html)
+
+        # Pages outside the moved subtree keep their cached breadcrumbs
+        with self.assertNumQueries(0):
+            self.render_breadcrumbs(self.about)
+
+    def test_breadcrumbs_are_updated_when_siblings_shift(self):
+        self.render_breadcrumbs(self.team)
+        self.render_breadcrumbs(self.contact)
+
+        # Treebeard shifts the paths of About and Team to make room
+        self.contact.move(self.about, pos="left")
+        self.team.refresh_from_db()
+        self.contact.refresh_from_db()
+
+        html = self.render_breadcrumbs(self.team)
+        self.assertIn('<a href="/test-home/about/">About</a>', html)
+        self.assertIn('<li aria-current="page">Team</li>', html)
+        self.assertIn(
+            '<li aria-current="page">Contact</li>',
+            self.render_breadcrumbs(self.contact),
+        )
+
+
+class FooterTextTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.request = RequestFactory().get("/")
+
+    def render_footer(self, **context):
+        return Template("{% load navigation_tags %}{% get_footer_text %}").render(
+            Context({"request": self.request, **context})
+        )
+
+    def test_footer_is_rendered_once(self):
+        FooterText.objects.create(body="<p>Baked fresh</p>")
+
+        self.assertIn("<p>Baked fresh</p>", self.render_footer())
+        with self.assertNumQueries(0):
+            self.assertIn("<p>Baked fresh</p>", self.render_footer())
+
+    def test_footer_is_updated_on_publish_and_unpublish(self):
+        footer_text = FooterText.objects.create(body="<p>Baked fresh</p>", live=False)
+        self.assertNotIn("Baked", self.render_footer())
+
+        footer_text.save_revision().publish()
+        self.assertIn("<p>Baked fresh</p>", self.render_footer())
+
+        footer_text.body = "<p>Baked daily</p>"
+        footer_text.save_revision().publish()
+        self.assertIn("<p>Baked daily</p>", self.render_footer())
+
+        footer_text.refresh_from_db()
+        footer_text.unpublish()
+        self.assertNotIn("Baked", self.render_footer())
+
+    def test_footer_is_updated_when_changed_by_another_process(self):
+        FooterText.objects.create(body="<p>Baked fresh</p>")
+        self.render_footer()
+
+        FooterText.objects.update(body="<p>Baked daily</p>")
+        self.assertIn("<p>Baked fresh</p>", self.render_footer())
+
+        # Another process invalidates the footer by changing its version
+        cache.set("navigation:footer_html:version", "other")
+        self.assertIn("<p>Baked daily</p>", self.render_footer())
+
+    def test_footer_text_from_context(self):
+        FooterText.objects.create(body="<p>Baked fresh</p>")
+
+        html = self.render_footer(footer_text="<p>Preview</p>")
+
+        self.assertIn("<p>Preview</p>", html)
+        self.assertNotIn("Baked", html)
+
+    def test_footer_is_in_the_active_language(self):
+        footer_text = FooterText.objects.create(body="<p>Baked fresh</p>")
+        FooterText.objects.create(
+            body="<p>Frisch gebacken</p>",
+            locale=Locale.objects.create(language_code="de"),
+            translation_key=footer_text.translation_key,
+        )
+        self.render_footer()
+
+        with self.assertNumQueries(0), translation.override("de"):
+            self.assertIn("<p>Frisch gebacken</p>", self.render_footer())
+
+        # There's no Arabic footer text, so the default language's is used
+        with translation.override("ar"):
+            self.assertIn("<p>Baked fresh</p>", self.render_footer())
+
+
+class SiteTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        root = Page.get_first_root_node()
+        cls.default_site = Site.objects.get(is_default_site=True)
+        cls.home = root.add_child(
+            instance=HomePage(
+                title="Home", slug="test-home", hero_text="Hi", hero_cta="Go"
+            )
+        )
+        cls.site = Site.objects.create(
+            hostname="bakery.example.com", port=80, root_page=cls.home
+        )
+
+    def setUp(self):
+        cache.clear()
+        get_site_for_request(RequestFactory().get("/"))
+
+    def test_site_is_found_without_a_query(self):
+        request = RequestFactory().get("/", HTTP_HOST="bakery.example.com")
+
+        with self.assertNumQueries(0):
+            self.assertEqual(get_site_for_request(request), self.site)
+            self.assertEqual(get_site_for_request(request).root_page.pk, self.home.pk)
+            # The site is stored on the request, where Wagtail looks for it
+            self.assertEqual(Site.find_for_request(request), self.site)
+
+    def test_site_is_matched_like_wagtail(self):
+        # A site sharing its hostname with the default site, on another port
+        Site.objects.create(
+            hostname=self.default_site.hostname, port=8001, root_page=self.home
+        )
+
+        for host, port in [
+            ("bakery.example.com", "8000"),
+            ("other.example.com", "80"),
+            ("localhost", "80"),
+            ("localhost", "8000"),
+            ("localhost", "8001"),
+        ]:
+            with self.subTest(host=host, port=port):
+                request = RequestFactory().get(
+                    "/", HTTP_HOST=f"{host}:{port}", SERVER_PORT=port
+                )
+                self.assertEqual(
+                    get_site_for_request(request),
+                    Site._find_for_request(request),
+                )
+
+    def test_sites_are_reloaded_when_changed(self):
+        self.site.hostname = "bread.example.com"
+        self.site.save()
+
+        request = RequestFactory().get("/", HTTP_HOST="bread.example.com")
+        self.assertEqual(get_site_for_request(request), self.site)
+
+
+class NavigationFragmentCacheTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        root = Page.get_first_root_node()
+        Site.objects.create(hostname="testserver", root_page=root, is_default_site=True)
+
+        cls.home = root.add_child(
+            instance=HomePage(
+                title="Home", slug="test-home", hero_text="Hi", hero_cta="Go"
+            )
+        )
+        cls.about = cls.home.add_child(
+            instance=StandardPage(title="About", slug="about", show_in_menus=True)
+        )
+
+    def setUp(self):
+        cache.clear()
+
+    def test_navigation_is_cached_until_the_version_changes(self):
+        response = self.client.get(self.about.url)
+        self.assertTemplateUsed(response, "includes/header.html")
+        self.assertTemplateUsed(response, "tags/breadcrumbs.html")
+        self.assertTemplateUsed(response, "includes/footer.html")
+
+        response = self.client.get(self.about.url)
+        self.assertTemplateNotUsed(response, "includes/header.html")
+        self.assertTemplateNotUsed(response, "tags/breadcrumbs.html")
+        self.assertTemplateNotUsed(response, "includes/footer.html")
+
+        self.about.title = "About us"
+        self.about.save_revision().publish()
+
+        response = self.client.get(self.about.url)
+        self.assertTemplateUsed(response, "includes/header.html")
+        self.assertContains(response, '<li aria-current="page">About us</li>')
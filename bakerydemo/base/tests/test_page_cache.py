@@ -0,0 +1,157 @@
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from wagtail.images import get_image_model
+from wagtail.images.tests.utils import get_test_image_file
+from wagtail.models import Page, Site
+
+from bakerydemo.base.invalidation import get_dependent_page_ids
+from bakerydemo.base.models import HomePage, Person, StandardPage
+from bakerydemo.blog.models import BlogIndexPage, BlogPage, BlogPersonRelationship
+from bakerydemo.breads.models import BreadPage, BreadsIndexPage
+
+Image = get_image_model()
+
+
+@override_settings(
+    MIDDLEWARE=[*settings.MIDDLEWARE, "bakerydemo.base.middleware.PageCacheMiddleware"]
+)
+class PageCacheTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        root = Page.get_first_root_node()
+        Site.objects.create(hostname="testserver", root_page=root, is_default_site=True)
+
+        cls.home = root.add_child(
+            instance=HomePage(
+                title="Home", slug="test-home", hero_text="Hi", hero_cta="Go"
+            )
+        )
+        cls.breads_index = cls.home.add_child(
+            instance=BreadsIndexPage(title="Breads", slug="breads")
+        )
+        cls.bread = cls.breads_index.add_child(
+            instance=BreadPage(title="Country loaf", slug="country-loaf")
+        )
+        cls.about = cls.home.add_child(
+            instance=StandardPage(title="About", slug="about")
+        )
+
+        cls.home.featured_section_1 = cls.about
+        cls.home.save_revision().publish()
+
+        cls.image = Image.objects.create(title="Portrait", file=get_test_image_file())
+        cls.person = Person.objects.create(
+            first_name="Olivia", last_name="Ava", job_title="Baker", image=cls.image
+        )
+        cls.blog_index = cls.home.add_child(
+            instance=BlogIndexPage(title="Blog", slug="blog")
+        )
+        cls.blog_post = cls.blog_index.add_child(
+            instance=BlogPage(
+                title="Sourdough",
+                slug="sourdough",
+                blog_person_relationship=[BlogPersonRelationship(person=cls.person)],
+            )
+        )
+
+    def setUp(self):
+        cache.clear()
+
+    def assertCached(self, url, **headers):
+        response = self.client.get(url, headers=headers)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.templates, [])
+
+    def assertNotCached(self, url, **headers):
+        response = self.client.get(url, headers=headers)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response.templates, [])
+
+    def test_pages_are_cached_for_anonymous_visitors(self):
+        self.assertNotCached(self.bread.url)
+        self.assertCached(self.bread.url)
+
+    def test_pages_are_not_cached_for_logged_in_users(self):
+        self.client.force_login(User.objects.create_superuser("admin"))
+
+        self.assertNotCached(self.bread.url)
+        self.assertNotCached(self.bread.url)
+
+    def test_pages_showing_messages_are_not_cached(self):
+        response = self.client.get(
+            f"{self.blog_index.url}tags/planted-text/", follow=True
+        )
+        self.assertContains(response, "planted-text")
+
+        self.client = self.client_class()
+        response = self.client.get(self.blog_index.url)
+        self.assertNotEqual(response.templates, [])
+        self.assertNotContains(response, "planted-text")
+
+    def test_pages_are_cached_per_accepted_image_format(self):
+        self.assertNotCached(self.bread.url, accept="image/avif,image/webp,*/*")
+        self.assertNotCached(self.bread.url, accept="image/webp,*/*")
+        self.assertCached(self.bread.url, accept="text/html,image/webp,*/*")
+
+    def test_publishing_purges_the_page_and_its_index(self):
+        for page in [self.bread, self.breads_index, self.about]:
+            self.client.get(page.url)
+
+        self.bread.save_revision().publish()
+
+        self.assertNotCached(self.bread.url)
+        self.assertNotCached(self.breads_index.url)
+        self.assertCached(self.about.url)
+
+    def test_publishing_purges_pages_that_reference_the_page(self):
+        for page in [self.home, self.bread]:
+            self.client.get(page.url)
+
+        self.about.save_revision().publish()
+
+        self.assertNotCached(self.home.url)
+        self.assertCached(self.bread.url)
+
+    def test_publishing_a_snippet_purges_the_pages_that_use_it(self):
+        for page in [self.home, self.blog_index, self.blog_post, self.bread]:
+            self.client.get(page.url)
+
+        self.person.save_revision().publish()
+
+        self.assertNotCached(self.blog_post.url)
+        self.assertNotCached(self.blog_index.url)
+        self.assertCached(self.home.url)
+        self.assertCached(self.bread.url)
+
+    def test_saving_an_image_purges_the_pages_that_use_it(self):
+        for page in [self.blog_index, self.blog_post, self.bread]:
+            self.client.get(page.url)
+
+        self.image.title = "Portrait of Olivia"
+        self.image.save()
+
+        # The blog post shows the image through its author
+        self.assertNotCached(self.blog_post.url)
+        self.assertNotCached(self.blog_index.url)
+        self.assertCached(self.bread.url)
+
+    def test_loading_fixtures_does_not_purge_pages(self):
+        self.client.get(self.blog_post.url)
+
+        with self.assertNumQueries(1):
+            self.image.save_base(raw=True)
+
+        self.assertCached(self.blog_post.url)
+
+    def test_dependent_pages_are_found_through_references_and_parents(self):
+        self.assertEqual(
+            get_dependent_page_ids(self.image),
+            {self.blog_post.pk, self.blog_index.pk},
+        )
+        self.assertEqual(
+            get_dependent_page_ids(self.about),
+            {self.about.pk, self.home.pk},
+        )
+        self.assertEqual(get_dependent_page_ids(self.image, max_depth=1), set())
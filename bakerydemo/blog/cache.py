@@ -0,0 +1,21 @@
+from django.core.cache import cache
+
+from bakerydemo.base import navigation
+
+# Index URLs are keyed by the navigation version, which changes whenever page
+# URLs may have, so old entries are never read again and just expire
+INDEX_URL_CACHE_TIMEOUT = 60 * 60 * 24
+
+
+def get_child_tags_cache_key(index_page_id):
+    return f"blog:child_tags:{index_page_id}"
+
+
+def get_index_url_cache_key(index_path, request=None):
+    return f"blog:index_url:{navigation.get_version(request)}:{index_path}"
+
+
+def invalidate_index_pages(*index_page_ids):
+    cache.delete_many(
+        [get_child_tags_cache_key(index_page_id) for index_page_id in index_page_ids]
+    )
@@ -0,0 +1,205 @@
+import datetime
+import hashlib
+
+from django.core.cache import cache
+from django.http import HttpResponse, JsonResponse
+from django.template.loader import render_to_string
+from django.utils.cache import get_conditional_response, quote_etag
+from django.utils.http import http_date
+from django.utils.safestring import mark_safe
+
+from bakerydemo.base import page_cache
+from bakerydemo.base.navigation import get_site_for_request
+
+from .pagination import KeysetPaginator
+
+# The number of the newest posts in each feed
+FEED_LENGTH = 20
+
+# Entries are keyed by their post's version, so old entries are never read
+# again and just expire
+ENTRY_CACHE_TIMEOUT = 60 * 60 * 24 * 7
+
+FEED_FORMATS = {
+    "rss": "application/rss+xml; charset=utf-8",
+    "atom": "application/atom+xml; charset=utf-8",
+    "json": "application/feed+json; charset=utf-8",
+}
+
+
+def get_published_at(post):
+    if post.date_published:
+        return datetime.datetime.combine(
+            post.date_published, datetime.time(), tzinfo=datetime.UTC
+        )
+    return post.first_published_at
+
+
+class BlogFeed:
+    """
+    A feed of the newest posts under a blog index, in RSS, Atom or JSON Feed
+    format.
+
+    Each entry is rendered once per post version, see `page_cache`, which
+    changes when the post, or anything it shows, e.g. its authors, changes.
+    So publishing a post only re-renders its own entry, and the rest of the
+    feed is assembled from cached entries. Entries are cached per site root
+    URL too, as they link to the posts with full URLs.
+
+    The feed's ETag is derived from the versions of the index page and of
+    the posts, so conditional requests from feed readers that are up to date
+    are answered without rendering anything.
+    """
+
+    def __init__(self, index_page, request, feed_format):
+        self.index_page = index_page
+        self.request = request
+        self.feed_format = feed_format
+        self.site = get_site_for_request(request)
+
+    def get_posts(self):
+        # Only what's needed to tell whether the entries are cached
+        return list(
+            self.index_page.get_posts()
+            .order_by(*KeysetPaginator.ordering)
+            .only("pk", "last_published_at")[:FEED_LENGTH]
+        )
+
+    def get_entry_cache_key(self, post_id, version):
+        root_url = self.site.root_url if self.site else ""
+        return f"blog:feed_entry:{self.feed_format}:{root_url}:{post_id}:{version}"
+
+    def get_etag(self, versions):
+        key = "|".join(
+            [
+                self.feed_format,
+                self.site.root_url if self.site else "",
+                *[f"{page_id}:{version}" for page_id, version in versions.items()],
+            ]
+        )
+        return hashlib.md5(key.encode()).hexdigest()
+
+    def get_last_modified(self, posts):
+        return max(
+            filter(
+                None,
+                [
+                    self.index_page.last_published_at,
+                    *[post.last_published_at for post in posts],
+                ],
+            ),
+            default=None,
+        )
+
+    def render_entry(self, post):
+        published_at = get_published_at(post)
+
+        if self.feed_format == "json":
+            item = {
+                "id": post.get_full_url(self.request),
+                "url": post.get_full_url(self.request),
+                "title": post.title,
+                "summary": post.introduction,
+                "content_html": str(post.body.render_as_block()),
+                "date_published": published_at,
+                "date_modified": post.last_published_at,
+                "authors": [{"name": str(author)} for author in post.authors()],
+                "tags": [tag.name for tag in post.tags.all()],
+            }
+            # Dates are optional in JSON Feed, so leave out the unknown ones
+            return {
+                key: value.isoformat()
+                if isinstance(value, datetime.datetime)
+                else value
+                for key, value in item.items()
+                if value is not None
+            }
+
+        return render_to_string(
+            f"blog/feeds/{self.feed_format}_entry.xml",
+            {"post": post, "published_at": published_at},
+            request=self.request,
+        )
+
+    def get_entries(self, posts, versions):
+        """
+        Returns the entries of the posts, rendering and caching only those
+        that aren't cached yet.
+        """
+        cache_keys = {
+            post.pk: self.get_entry_cache_key(post.pk, versions[post.pk])
+            for post in posts
+        }
+        entries = cache.get_many(cache_keys.values())
+
+        missing_ids = [post.pk for post in posts if cache_keys[post.pk] not in entries]
+        if missing_ids:
+            rendered = {
+                cache_keys[post.pk]: self.render_entry(post)
+                for post in self.index_page.get_posts()
+                .filter(pk__in=missing_ids)
+                .with_authors()
+                .with_tags()
+            }
+            cache.set_many(rendered, ENTRY_CACHE_TIMEOUT)
+            entries.update(rendered)
+
+        return [entries[cache_keys[post.pk]] for post in posts]
+
+    def render(self, entries, last_modified):
+        feed_url = self.request.build_absolute_uri()
+        index_url = self.index_page.get_full_url(self.request)
+
+        if self.feed_format == "json":
+            return JsonResponse(
+                {
+                    "version": "https://jsonfeed.org/version/1.1",
+                    "title": self.index_page.title,
+                    "home_page_url": index_url,
+                    "feed_url": feed_url,
+                    "description": self.index_page.introduction,
+                    "items": entries,
+                },
+                content_type=FEED_FORMATS["json"],
+            )
+
+        return HttpResponse(
+            render_to_string(
+                f"blog/feeds/{self.feed_format}.xml",
+                {
+                    "index_page": self.index_page,
+                    "index_url": index_url,
+                    "feed_url": feed_url,
+                    "last_modified": last_modified,
+                    # The entries were rendered, and escaped, from templates
+                    "entries": mark_safe("".join(entries)),
+                },
+                request=self.request,
+            ),
+            content_type=FEED_FORMATS[self.feed_format],
+        )
+
+    def serve(self):
+        posts = self.get_posts()
+        versions = page_cache.get_page_versions(
+            [self.index_page.pk, *[post.pk for post in posts]]
+        )
+        etag = quote_etag(self.get_etag(versions))
+        last_modified = self.get_last_modified(posts)
+        last_modified_timestamp = (
+            int(last_modified.timestamp()) if last_modified else None
+        )
+
+        response = get_conditional_response(
+            self.request, etag=etag, last_modified=last_modified_timestamp
+        )
+        if response is None:
+            entries = self.get_entries(posts, versions)
+            response = self.render(entries, last_modified)
+
+        response.headers.setdefault("ETag", etag)
+        if last_modified_timestamp:
+            response.headers.setdefault(
+                "Last-Modified", http_date(last_modified_timestamp)
+            )
+        return response
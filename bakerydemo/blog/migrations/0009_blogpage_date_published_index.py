@@ -0,0 +1,19 @@
+# Generated by Django 6.0.9 on 2026-10-18 17:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("blog", "0008_alter_blogpage_body"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="blogpage",
+            index=models.Index(
+                fields=["date_published", "page_ptr"],
+                name="blog_post_date_published_idx",
+            ),
+        ),
+    ]
@@ -1,5 +1,7 @@
 from django.contrib import messages
+from django.core.cache import cache
 from django.db import models
+from django.db.models import Count, Prefetch
 from django.shortcuts import redirect, render
 from modelcluster.contrib.taggit import ClusterTaggableManager
 from modelcluster.fields import ParentalKey
@@ -9,11 +11,20 @@ from wagtail.api import APIField
 from wagtail.contrib.routable_page.models import RoutablePageMixin, route
 from wagtail.fields import StreamField
 from wagtail.images.api.fields import ImageRenditionField
-from wagtail.models import Orderable, Page
+from wagtail.models import Orderable, Page, PageManager
+from wagtail.query import PageQuerySet
 from wagtail.search import index
 
 from bakerydemo.base.blocks import BaseStreamBlock
 
+from .cache import (
+    INDEX_URL_CACHE_TIMEOUT,
+    get_child_tags_cache_key,
+    get_index_url_cache_key,
+)
+from .feeds import BlogFeed
+from .pagination import KeysetPaginator
+
 
 class BlogPersonRelationship(Orderable, models.Model):
     """
@@ -50,6 +61,33 @@ class BlogPageTag(TaggedItemBase):
     )
 
 
+class BlogPageQuerySet(PageQuerySet):
+    def with_tags(self):
+        """
+        Fetches the tags of all the posts in one query, for listings that
+        show them through `get_tags_with_urls`.
+        """
+        return self.prefetch_related("tags")
+
+    def with_authors(self):
+        """
+        Fetches the live authors of all the posts, with their images, and the
+        images' renditions, in two queries, for `authors` to read.
+        """
+        return self.prefetch_related(
+            Prefetch(
+                "blog_person_relationship",
+                queryset=BlogPersonRelationship.objects.filter(person__live=True)
+                .select_related("person__image")
+                .prefetch_related("person__image__renditions"),
+                to_attr="live_author_relationships",
+            )
+        )
+
+
+BlogPageManager = PageManager.from_queryset(BlogPageQuerySet)
+
+
 class BlogPage(Page):
     """
     A Blog Page
@@ -75,6 +113,8 @@ class BlogPage(Page):
     tags = ClusterTaggableManager(through=BlogPageTag, blank=True)
     date_published = models.DateField("Date article published", blank=True, null=True)
 
+    objects = BlogPageManager()
+
     content_panels = Page.content_panels + [
         FieldPanel("subtitle"),
         FieldPanel("introduction"),
@@ -128,6 +168,10 @@ class BlogPage(Page):
         with a loop on the template. If we tried to access the blog_person_
         relationship directly we'd print `blog.BlogPersonRelationship.None`
         """
+        # Prefetched by `BlogPage.objects.with_authors()`
+        if hasattr(self, "live_author_relationships"):
+            return [n.person for n in self.live_author_relationships]
+
         # Only return authors that are not in draft
         return [
             n.person
@@ -136,6 +180,19 @@ class BlogPage(Page):
             ).select_related("person")
         ]
 
+    def get_index_url(self, request=None):
+        """
+        Returns the URL of the post's index page. It's cached by the index
+        page's path, which the post knows without fetching its parent, so the
+        posts in a listing share it. Passing the request reuses the navigation
+        version it has already fetched.
+        """
+        return cache.get_or_set(
+            get_index_url_cache_key(self.path[: -self.steplen], request),
+            lambda: self.get_parent().url,
+            INDEX_URL_CACHE_TIMEOUT,
+        )
+
     @property
     def get_tags(self):
         """
@@ -143,12 +200,24 @@ class BlogPage(Page):
         are related to the blog post into a list we can access on the template.
         We're additionally adding a URL to access BlogPage objects with that tag
         """
+        return self.get_tags_with_urls(self.get_index_url())
+
+    def get_tags_with_urls(self, index_url):
+        """
+        Returns the post's tags, linked to the tag archives of the index page
+        at `index_url`. Listings look the URL up once and pass it in for each
+        of their posts.
+        """
         tags = self.tags.all()
-        base_url = self.get_parent().url
         for tag in tags:
-            tag.url = f"{base_url}tags/{tag.slug}/"
+            tag.url = f"{index_url}tags/{tag.slug}/"
         return tags
 
+    def get_context(self, request):
+        context = super().get_context(request)
+        context["tags"] = self.get_tags_with_urls(self.get_index_url(request))
+        return context
+
     # Specifies parent to BlogPage as being BlogIndexPages
     parent_page_types = ["BlogIndexPage"]
 
@@ -156,6 +225,15 @@ class BlogPage(Page):
     # Empty list means that no child content types are allowed.
     subpage_types = []
 
+    class Meta:
+        indexes = [
+            # Supports paginating posts from the newest, see KeysetPaginator
+            models.Index(
+                fields=["date_published", "page_ptr"],
+                name="blog_post_date_published_idx",
+            ),
+        ]
+
 
 class BlogIndexPage(RoutablePageMixin, Page):
     """
@@ -195,16 +273,21 @@ class BlogIndexPage(RoutablePageMixin, Page):
     def children(self):
         return self.get_children().specific().live()
 
-    # Overrides the context to list all child items, that are live, by the
-    # date that they were published
+    # Overrides the context to list the child items that are live, a page at a
+    # time, by the date that they were published
     # https://docs.wagtail.org/en/stable/getting_started/tutorial.html#overriding-context
     def get_context(self, request):
         context = super().get_context(request)
-        context["posts"] = (
-            BlogPage.objects.descendant_of(self).live().order_by("-date_published")
-        )
+        context["posts"] = self.paginate(request, self.get_posts())
         return context
 
+    # Pagination for the index page and tag archive. Rather than page numbers,
+    # the pages after and before are linked to by the post they start after,
+    # or end before, so that deep pages are as cheap to fetch as the first
+    def paginate(self, request, posts):
+        paginator = KeysetPaginator(posts.with_authors(), 12)
+        return paginator.page(request.GET.get("after"), request.GET.get("before"))
+
     # This defines a Custom view that utilizes Tags. This view will return all
     # related BlogPages for a given Tag or redirect back to the BlogIndexPage.
     # More information on RoutablePages is at
@@ -212,18 +295,34 @@ class BlogIndexPage(RoutablePageMixin, Page):
     @route(r"^tags/$", name="tag_archive")
     @route(r"^tags/([\w-]+)/$", name="tag_archive")
     def tag_archive(self, request, tag=None):
+        # Only the tags of live posts under this index have an archive, and
+        # they're looked up from the cached tag cloud, so unknown tags are
+        # redirected without a query
+        tags_by_slug = {
+            child_tag.slug: child_tag for child_tag in self.get_child_tags()
+        }
         try:
-            tag = Tag.objects.get(slug=tag)
-        except Tag.DoesNotExist:
+            tag = tags_by_slug[tag]
+        except KeyError:
             if tag:
                 msg = f'There are no blog posts tagged with "{tag}"'
                 messages.add_message(request, messages.INFO, msg)
             return redirect(self.url)
 
-        posts = self.get_posts(tag=tag)
+        posts = self.paginate(request, self.get_posts(tag=tag))
         context = {"self": self, "tag": tag, "posts": posts}
         return render(request, "blog/blog_index_page.html", context)
 
+    # Syndication feeds of the newest posts, in RSS, Atom or JSON Feed format
+    @route(r"^feed/$", name="feed")
+    @route(r"^feed/(atom|json)/$", name="feed")
+    def feed(self, request, feed_format="rss"):
+        return BlogFeed(self, request, feed_format).serve()
+
+    def get_cached_paths(self):
+        # Purge the feeds from the frontend cache along with the index page
+        return ["/", "/feed/", "/feed/atom/", "/feed/json/"]
+
     def serve_preview(self, request, mode_name):
         # Needed for previews to work
         return self.serve(request)
@@ -233,14 +332,36 @@ class BlogIndexPage(RoutablePageMixin, Page):
     def get_posts(self, tag=None):
         posts = BlogPage.objects.live().descendant_of(self)
         if tag:
-            posts = posts.filter(tags=tag)
+            # Filtering on the through model's tag ID skips joining the tags
+            posts = posts.filter(tagged_items__tag_id=tag.pk)
         return posts
 
     # Returns the list of Tags for all child posts of this BlogPage.
     def get_child_tags(self):
-        tags = []
-        for post in self.get_posts():
-            # Not tags.append() because we don't want a list of lists
-            tags += post.get_tags
-        tags = sorted(set(tags))
+        """
+        Returns the tags of the live posts under this index, sorted by name,
+        each with the number of posts that have it as `post_count`, and the
+        URL of its archive. They're fetched in one query, and cached until a
+        post under this index is published or unpublished.
+        """
+        cache_key = get_child_tags_cache_key(self.pk)
+        tags = cache.get(cache_key)
+
+        if tags is None:
+            tags = list(
+                Tag.objects.filter(
+                    blog_blogpagetag_items__content_object__in=self.get_posts()
+                )
+                .annotate(
+                    post_count=Count(
+                        "blog_blogpagetag_items__content_object", distinct=True
+                    )
+                )
+                .order_by("name")
+            )
+            cache.set(cache_key, tags, None)
+
+        base_url = self.url
+        for tag in tags:
+            tag.url = f"{base_url}tags/{tag.slug}/"
         return tags
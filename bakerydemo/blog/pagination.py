@@ -0,0 +1,141 @@
+import datetime
+
+from django.db.models import F, Q
+from django.utils.functional import cached_property
+
+
+class KeysetPaginator:
+    """
+    Paginates posts from the newest, keyed on `(date_published, pk)` rather
+    than on a page number. A page starts right after, or ends right before,
+    the post given as a cursor, so fetching it is an index range scan however
+    deep it is, instead of an `OFFSET` that skips over every earlier post.
+
+    Posts without a date come first, as `-date_published` orders them on
+    PostgreSQL, and matches a backwards scan of the `(date_published, pk)`
+    index.
+    """
+
+    ordering = (F("date_published").desc(nulls_first=True), F("pk").desc())
+    reverse_ordering = (F("date_published").asc(nulls_last=True), F("pk").asc())
+
+    def __init__(self, object_list, per_page):
+        self.object_list = object_list
+        self.per_page = per_page
+
+    @staticmethod
+    def parse_cursor(cursor):
+        """
+        Returns the `(date_published, pk)` key encoded in a cursor such as
+        `2024-02-29.12`, or `.12` for a post without a date, or None if the
+        cursor isn't valid. This doesn't touch the database.
+        """
+        try:
+            date, pk = cursor.split(".")
+            return (datetime.date.fromisoformat(date) if date else None, int(pk))
+        except (AttributeError, ValueError):
+            return None
+
+    @staticmethod
+    def get_cursor(post):
+        date = post.date_published.isoformat() if post.date_published else ""
+        return f"{date}.{post.pk}"
+
+    def get_after_filter(self, key):
+        date, pk = key
+        if date is None:
+            return Q(date_published__isnull=True, pk__lt=pk) | Q(
+                date_published__isnull=False
+            )
+        return Q(date_published__lt=date) | Q(date_published=date, pk__lt=pk)
+
+    def get_before_filter(self, key):
+        date, pk = key
+        if date is None:
+            return Q(date_published__isnull=True, pk__gt=pk)
+        return (
+            Q(date_published__isnull=True)
+            | Q(date_published__gt=date)
+            | Q(date_published=date, pk__gt=pk)
+        )
+
+    def page(self, after=None, before=None):
+        """
+        Returns the page of posts after the `after` cursor, or before the
+        `before` cursor, or the first page if neither is valid. The posts are
+        only fetched when the page is first used.
+        """
+        return KeysetPage(self, self.parse_cursor(after), self.parse_cursor(before))
+
+    def fetch(self, after_key=None, before_key=None):
+        """
+        Returns the posts of a page, and whether there are pages before and
+        after it. Each page fetches `per_page + 1` posts, so the extra one
+        tells us whether there is another page in that direction.
+        """
+        if after_key is None and before_key is not None:
+            posts = list(
+                self.object_list.filter(self.get_before_filter(before_key)).order_by(
+                    *self.reverse_ordering
+                )[: self.per_page + 1]
+            )
+            if len(posts) > self.per_page:
+                return posts[: self.per_page][::-1], True, True
+            # There's less than a page of posts before the cursor, e.g. if
+            # posts were published since, so serve a full first page instead
+            return self.fetch()
+
+        object_list = self.object_list
+        if after_key is not None:
+            object_list = object_list.filter(self.get_after_filter(after_key))
+        posts = list(object_list.order_by(*self.ordering)[: self.per_page + 1])
+        if not posts and after_key is not None:
+            # The cursor is past the last post, e.g. if posts were unpublished
+            # since, so start again from the first page
+            return self.fetch()
+        return posts[: self.per_page], after_key is not None, len(posts) > self.per_page
+
+
+class KeysetPage:
+    """
+    A page of posts, with the cursors of the pages either side of it. The
+    posts are fetched when the page is first used, so that a page rendered
+    from the fragment cache doesn't query them at all.
+    """
+
+    def __init__(self, paginator, after_key=None, before_key=None):
+        self.paginator = paginator
+        self.after_key = after_key
+        self.before_key = before_key
+
+    @cached_property
+    def _fetched(self):
+        return self.paginator.fetch(self.after_key, self.before_key)
+
+    @property
+    def object_list(self):
+        return self._fetched[0]
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __bool__(self):
+        return bool(self.object_list)
+
+    def has_previous(self):
+        return self._fetched[1]
+
+    def has_next(self):
+        return self._fetched[2]
+
+    def has_other_pages(self):
+        return self.has_previous() or self.has_next()
+
+    def previous_cursor(self):
+        return KeysetPaginator.get_cursor(self.object_list[0])
+
+    def next_cursor(self):
+        return KeysetPaginator.get_cursor(self.object_list[-1])
@@ -0,0 +1,35 @@
+from django.db.models.signals import post_delete, post_save
+from taggit.models import Tag
+from wagtail.signals import page_published, page_unpublished, post_page_move
+
+from .cache import invalidate_index_pages
+from .models import BlogIndexPage, BlogPage
+
+
+def invalidate_parent_index(instance, **kwargs):
+    # The post's tags, or whether it's live, may have changed
+    invalidate_index_pages(instance.get_parent().pk)
+
+
+def invalidate_moved_post_indexes(parent_page_before, parent_page_after, **kwargs):
+    invalidate_index_pages(parent_page_before.pk, parent_page_after.pk)
+
+
+def invalidate_all_indexes(**kwargs):
+    # A tag was renamed or deleted, and it may be used under any index
+    invalidate_index_pages(*BlogIndexPage.objects.values_list("pk", flat=True))
+
+
+def invalidate_all_indexes_on_change(created, **kwargs):
+    # New tags aren't used by any live post yet
+    if not created:
+        invalidate_all_indexes()
+
+
+def register_signal_handlers():
+    page_published.connect(invalidate_parent_index, sender=BlogPage)
+    page_unpublished.connect(invalidate_parent_index, sender=BlogPage)
+    post_page_move.connect(invalidate_moved_post_indexes, sender=BlogPage)
+
+    post_save.connect(invalidate_all_indexes_on_change, sender=Tag)
+    post_delete.connect(invalidate_all_indexes, sender=Tag)
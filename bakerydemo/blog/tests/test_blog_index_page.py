@@ -0,0 +1,160 @@
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from wagtail.models import Page, Site
+
+from bakerydemo.blog.models import BlogIndexPage, BlogPage
+
+
+class ChildTagsTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        root = Page.get_first_root_node()
+        Site.objects.create(hostname="testserver", root_page=root, is_default_site=True)
+
+        cls.blog_index = root.add_child(
+            instance=BlogIndexPage(title="Blog", slug="test-blog")
+        )
+        cls.other_index = root.add_child(
+            instance=BlogIndexPage(title="Other blog", slug="other-blog")
+        )
+        cls.add_post(cls.blog_index, "Sourdough", ["bread", "starter"])
+        cls.add_post(cls.blog_index, "Rye", ["bread"])
+        cls.add_post(cls.other_index, "Croissants", ["pastry"])
+
+    @staticmethod
+    def add_post(index, title, tags, live=True):
+        post = BlogPage(title=title, slug=title.lower(), live=live)
+        post.tags.add(*tags)
+        return index.add_child(instance=post)
+
+    def setUp(self):
+        cache.clear()
+
+    def get_child_tags(self, index):
+        return [(tag.name, tag.post_count, tag.url) for tag in index.get_child_tags()]
+
+    def test_child_tags_have_post_counts_and_urls(self):
+        self.assertEqual(
+            self.get_child_tags(self.blog_index),
+            [
+                ("bread", 2, f"{self.blog_index.url}tags/bread/"),
+                ("starter", 1, f"{self.blog_index.url}tags/starter/"),
+            ],
+        )
+
+    def test_child_tags_are_cached(self):
+        self.blog_index.get_child_tags()
+
+        with self.assertNumQueries(0):
+            self.assertEqual(len(self.blog_index.get_child_tags()), 2)
+
+    def test_draft_posts_are_ignored(self):
+        self.add_post(self.blog_index, "Focaccia", ["focaccia"], live=False)
+
+        self.assertNotIn(
+            "focaccia", [tag.name for tag in self.blog_index.get_child_tags()]
+        )
+
+    def test_publishing_a_post_invalidates_its_index(self):
+        self.blog_index.get_child_tags()
+        self.other_index.get_child_tags()
+
+        post = self.add_post(self.blog_index, "Focaccia", ["focaccia"], live=False)
+        post.save_revision().publish()
+
+        self.assertIn(
+            "focaccia", [tag.name for tag in self.blog_index.get_child_tags()]
+        )
+        with self.assertNumQueries(0):
+            self.other_index.get_child_tags()
+
+    def test_unpublishing_a_post_invalidates_its_index(self):
+        self.blog_index.get_child_tags()
+
+        BlogPage.objects.get(slug="sourdough").unpublish()
+
+        self.assertEqual(
+            self.get_child_tags(self.blog_index),
+            [("bread", 1, f"{self.blog_index.url}tags/bread/")],
+        )
+
+
+class PostListingCacheTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        root = Page.get_first_root_node()
+        Site.objects.create(hostname="testserver", root_page=root, is_default_site=True)
+
+        cls.blog_index = root.add_child(
+            instance=BlogIndexPage(title="Blog", slug="test-blog")
+        )
+        for title in ["Sourdough", "Rye"]:
+            post = BlogPage(title=title, slug=title.lower())
+            post.tags.add("bread")
+            cls.blog_index.add_child(instance=post)
+
+    def setUp(self):
+        cache.clear()
+
+    def get_post_queries(self, url):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return [query for query in queries if "blog_blogpage" in query["sql"]]
+
+    def test_post_listing_is_cached(self):
+        for url in [self.blog_index.url, f"{self.blog_index.url}tags/bread/"]:
+            with self.subTest(url=url):
+                self.assertTrue(self.get_post_queries(url))
+                self.assertFalse(self.get_post_queries(url))
+
+
+class TagArchiveTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        root = Page.get_first_root_node()
+        Site.objects.create(hostname="testserver", root_page=root, is_default_site=True)
+
+        cls.blog_index = root.add_child(
+            instance=BlogIndexPage(title="Blog", slug="test-blog")
+        )
+        other_index = root.add_child(
+            instance=BlogIndexPage(title="Other blog", slug="other-blog")
+        )
+        for index, title, tags in [
+            (cls.blog_index, "Sourdough", ["bread", "starter"]),
+            (cls.blog_index, "Rye", ["bread"]),
+            (other_index, "Croissants", ["pastry"]),
+        ]:
+            post = BlogPage(title=title, slug=title.lower())
+            post.tags.add(*tags)
+            index.add_child(instance=post)
+
+    def setUp(self):
+        cache.clear()
+
+    def test_tag_archive_lists_the_posts_with_the_tag(self):
+        response = self.client.get(f"{self.blog_index.url}tags/starter/")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context["tag"].name, "starter")
+        self.assertEqual(
+            [post.title for post in response.context["posts"]], ["Sourdough"]
+        )
+
+    def test_tags_not_used_under_the_index_are_redirected(self):
+        for slug in ["pastry", "unknown"]:
+            with self.subTest(slug=slug):
+                response = self.client.get(f"{self.blog_index.url}tags/{slug}/")
+
+                self.assertRedirects(response, self.blog_index.url)
+
+    def test_unknown_tags_are_redirected_without_querying_tags(self):
+        self.blog_index.get_child_tags()
+
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(f"{self.blog_index.url}tags/unknown/")
+
+        self.assertFalse([query for query in queries if "taggit_tag" in query["sql"]])
@@ -0,0 +1,109 @@
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import TestCase
+from wagtail.models import Page, Site
+
+from bakerydemo.base import navigation
+from bakerydemo.base.models import Person
+from bakerydemo.blog.models import BlogIndexPage, BlogPage, BlogPersonRelationship
+
+
+class TagsTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        root = Page.get_first_root_node()
+        Site.objects.create(hostname="testserver", root_page=root, is_default_site=True)
+
+        cls.blog_index = root.add_child(
+            instance=BlogIndexPage(title="Blog", slug="test-blog")
+        )
+        for title in ["Sourdough", "Rye", "Focaccia"]:
+            post = BlogPage(title=title, slug=title.lower())
+            post.tags.add("bread", title.lower())
+            cls.blog_index.add_child(instance=post)
+
+    def setUp(self):
+        cache.clear()
+
+    def test_tags_link_to_the_tag_archive(self):
+        post = BlogPage.objects.get(slug="rye")
+
+        self.assertEqual(
+            {tag.name: tag.url for tag in post.get_tags},
+            {
+                "bread": f"{self.blog_index.url}tags/bread/",
+                "rye": f"{self.blog_index.url}tags/rye/",
+            },
+        )
+
+    def test_listing_tags_take_a_fixed_number_of_queries(self):
+        index_url = BlogPage.objects.first().get_index_url()
+
+        # The posts and their tags
+        with self.assertNumQueries(2):
+            for post in BlogPage.objects.live().with_tags():
+                self.assertEqual(len(post.get_tags_with_urls(index_url)), 2)
+
+    def test_post_page_fetches_the_navigation_version_once(self):
+        post = BlogPage.objects.get(slug="rye")
+        self.client.get(post.url)
+
+        with mock.patch.object(
+            navigation.cache, "get_or_set", wraps=navigation.cache.get_or_set
+        ) as get_or_set:
+            response = self.client.get(post.url)
+
+        self.assertContains(response, f"{self.blog_index.url}tags/rye/")
+        version_lookups = [
+            call
+            for call in get_or_set.call_args_list
+            if call.args[0] == navigation.VERSION_CACHE_KEY
+        ]
+        self.assertEqual(len(version_lookups), 1)
+
+    def test_index_url_changes_with_the_index_slug(self):
+        post = BlogPage.objects.get(slug="rye")
+        post.get_index_url()
+
+        self.blog_index.slug = "news"
+        self.blog_index.save_revision().publish()
+
+        self.assertEqual(post.get_index_url(), self.blog_index.url)
+
+
+class AuthorsTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        root = Page.get_first_root_node()
+        blog_index = root.add_child(instance=BlogIndexPage(title="Blog", slug="blog"))
+
+        cls.author = Person.objects.create(
+            first_name="Olivia", last_name="Ava", job_title="Baker"
+        )
+        draft_author = Person.objects.create(
+            first_name="Liam", last_name="Noah", job_title="Baker", live=False
+        )
+        for title in ["Sourdough", "Rye", "Focaccia"]:
+            blog_index.add_child(
+                instance=BlogPage(
+                    title=title,
+                    slug=title.lower(),
+                    blog_person_relationship=[
+                        BlogPersonRelationship(person=cls.author),
+                        BlogPersonRelationship(person=draft_author),
+                    ],
+                )
+            )
+
+    def test_authors_are_live_people(self):
+        post = BlogPage.objects.get(slug="rye")
+
+        self.assertEqual(post.authors(), [self.author])
+
+    def test_listing_authors_take_a_fixed_number_of_queries(self):
+        # The posts and their authors. The authors have no images, so there
+        # are no renditions to fetch.
+        with self.assertNumQueries(2):
+            for post in BlogPage.objects.live().with_authors():
+                self.assertEqual(post.authors(), [self.author])
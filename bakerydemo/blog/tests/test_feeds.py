@@ -0,0 +1,95 @@
+import datetime
+import json
+
+from django.core.cache import cache
+from django.test import TestCase
+from wagtail.models import Page, Site
+
+from bakerydemo.blog.models import BlogIndexPage, BlogPage
+
+
+class BlogFeedTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        root = Page.get_first_root_node()
+        Site.objects.create(hostname="testserver", root_page=root, is_default_site=True)
+
+        cls.blog_index = root.add_child(
+            instance=BlogIndexPage(title="Blog", slug="test-blog")
+        )
+        for day, title in enumerate(["Sourdough", "Rye", "Focaccia"], start=1):
+            cls.blog_index.add_child(
+                instance=BlogPage(
+                    title=title,
+                    slug=title.lower(),
+                    introduction=f"All about {title.lower()}",
+                    date_published=datetime.date(2024, 1, day),
+                )
+            )
+
+    def setUp(self):
+        cache.clear()
+
+    def get_feed(self, feed_format="", **headers):
+        path = f"{self.blog_index.url}feed/"
+        if feed_format:
+            path += f"{feed_format}/"
+        return self.client.get(path, headers=headers)
+
+    def test_feeds_list_the_newest_posts_first(self):
+        for feed_format, content_type in [
+            ("", "application/rss+xml"),
+            ("atom", "application/atom+xml"),
+        ]:
+            with self.subTest(feed_format=feed_format):
+                response = self.get_feed(feed_format)
+
+                self.assertEqual(response.status_code, 200)
+                self.assertTrue(response["Content-Type"].startswith(content_type))
+                content = response.content.decode()
+                self.assertLess(content.index("Focaccia"), content.index("Rye"))
+                self.assertLess(content.index("Rye"), content.index("Sourdough"))
+
+    def test_json_feed(self):
+        response = self.get_feed("json")
+
+        self.assertTrue(response["Content-Type"].startswith("application/feed+json"))
+        feed = json.loads(response.content)
+        self.assertEqual(
+            [item["title"] for item in feed["items"]],
+            ["Focaccia", "Rye", "Sourdough"],
+        )
+        self.assertEqual(feed["items"][0]["summary"], "All about focaccia")
+
+    def test_up_to_date_feeds_are_not_modified(self):
+        response = self.get_feed()
+
+        response = self.get_feed(If_None_Match=response["ETag"])
+
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.templates, [])
+
+    def test_publishing_a_post_changes_the_feed(self):
+        etag = self.get_feed()["ETag"]
+
+        post = BlogPage.objects.get(slug="rye")
+        post.introduction = "All about rye bread"
+        post.save_revision().publish()
+
+        response = self.get_feed(If_None_Match=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "All about rye bread")
+
+    def test_publishing_a_post_only_renders_its_entry_again(self):
+        self.get_feed()
+
+        post = BlogPage.objects.get(slug="rye")
+        post.save_revision().publish()
+
+        response = self.get_feed()
+
+        self.assertEqual(
+            [template.name for template in response.templates],
+            ["blog/feeds/rss_entry.xml", "blog/feeds/rss.xml"],
+        )
+        self.assertEqual(response.context["post"], post)
@@ -0,0 +1,92 @@
+import datetime
+
+from django.test import TestCase
+from wagtail.models import Page, Site
+
+from bakerydemo.blog.models import BlogIndexPage, BlogPage
+from bakerydemo.blog.pagination import KeysetPaginator
+
+
+class KeysetPaginatorTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        root = Page.get_first_root_node()
+        Site.objects.create(hostname="testserver", root_page=root, is_default_site=True)
+        cls.blog_index = root.add_child(
+            instance=BlogIndexPage(title="Blog", slug="test-blog")
+        )
+
+        # Some posts share a date, and some have none
+        dates = [
+            None,
+            None,
+            *[datetime.date(2024, 1, day // 2 + 1) for day in range(7)],
+        ]
+        for i, date in enumerate(dates):
+            cls.blog_index.add_child(
+                instance=BlogPage(
+                    title=f"Post {i}", slug=f"post-{i}", date_published=date
+                )
+            )
+
+        # Undated posts first, then from the newest
+        posts = BlogPage.objects.all()
+        cls.posts = [
+            *sorted(
+                [post for post in posts if post.date_published is None],
+                key=lambda post: post.pk,
+                reverse=True,
+            ),
+            *sorted(
+                [post for post in posts if post.date_published is not None],
+                key=lambda post: (post.date_published, post.pk),
+                reverse=True,
+            ),
+        ]
+
+    def setUp(self):
+        self.paginator = KeysetPaginator(BlogPage.objects.all(), 2)
+
+    def test_pages_follow_each_other(self):
+        posts = []
+        page = self.paginator.page()
+        while True:
+            with self.assertNumQueries(1):
+                posts += page
+            if not page.has_next():
+                break
+            page = self.paginator.page(after=page.next_cursor())
+
+        self.assertEqual(posts, self.posts)
+        self.assertTrue(page.has_previous())
+
+    def test_pages_precede_each_other(self):
+        page = self.paginator.page(after=KeysetPaginator.get_cursor(self.posts[6]))
+        self.assertEqual(list(page), self.posts[7:9])
+
+        page = self.paginator.page(before=page.previous_cursor())
+        self.assertEqual(list(page), self.posts[5:7])
+        self.assertTrue(page.has_previous())
+        self.assertTrue(page.has_next())
+
+    def test_page_before_the_second_page_is_the_first_page(self):
+        page = self.paginator.page(before=KeysetPaginator.get_cursor(self.posts[1]))
+
+        self.assertEqual(list(page), self.posts[:2])
+        self.assertFalse(page.has_previous())
+
+    def test_invalid_cursors_are_ignored(self):
+        with self.assertNumQueries(0):
+            for cursor in [None, "", "abc", "2024-13-01.1", "2024-01-01.abc", "1.2.3"]:
+                self.assertIsNone(KeysetPaginator.parse_cursor(cursor))
+
+        self.assertEqual(list(self.paginator.page(after="abc")), self.posts[:2])
+
+    def test_index_page_links_to_the_previous_page(self):
+        after = KeysetPaginator.get_cursor(self.posts[0])
+        response = self.client.get(self.blog_index.url, {"after": after})
+
+        self.assertEqual(list(response.context["posts"]), self.posts[1:])
+        self.assertContains(
+            response, f"?before={KeysetPaginator.get_cursor(self.posts[1])}"
+        )
@@ -0,0 +1,109 @@
+import hashlib
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+from wagtail.models import Page
+from wagtail.search.utils import normalise_query_string
+
+# Bumped whenever a searchable page is published or unpublished. It's part of
+# every cache key, so bumping it invalidates all cached search results at once.
+VERSION_CACHE_KEY = "search_results:version"
+
+CACHE_TIMEOUT = 60 * 60
+
+
+def get_version():
+    return cache.get_or_set(VERSION_CACHE_KEY, lambda: uuid.uuid4().hex, None)
+
+
+def invalidate():
+    # A new random version, rather than an incremented one, can't collide with
+    # a version that was evicted from the cache
+    cache.set(VERSION_CACHE_KEY, uuid.uuid4().hex, None)
+
+
+class CachedSearchResults:
+    """
+    Wraps lazy search results so that each slice of them, i.e. each page, is
+    cached as a ranked list of page IDs, keyed by the normalised query, any
+    selected facets and the search backend. Repeated searches then only fetch
+    the specific pages by ID, and skip the search backend entirely. Result
+    counts are cached the same way.
+
+    Like the search results it wraps, this is lazy and supports slicing and
+    `count()`, so it can be passed to a paginator.
+    """
+
+    def __init__(self, search_results, search_query, filters=None, start=0, stop=None):
+        self.search_results = search_results
+        self.search_query = search_query
+        self.filters = filters or {}
+        self.start = start
+        self.stop = stop
+        self._results_cache = None
+
+    def __getitem__(self, key):
+        if not isinstance(key, slice) or key.step is not None:
+            raise TypeError("Cached search results can only be sliced")
+        start = self.start + (key.start or 0)
+        stop = self.start + key.stop if key.stop is not None else self.stop
+        if self.stop is not None and stop is not None:
+            stop = min(stop, self.stop)
+        return CachedSearchResults(
+            self.search_results, self.search_query, self.filters, start, stop
+        )
+
+    def get_cache_key(self, *parts):
+        backend = settings.WAGTAILSEARCH_BACKENDS["default"]["BACKEND"]
+        query = normalise_query_string(self.search_query)
+        filters = sorted(self.filters.items())
+        key = "|".join(
+            map(str, [backend, query, filters, self.start, self.stop, *parts])
+        )
+        digest = hashlib.md5(key.encode()).hexdigest()
+        return f"search_results:{get_version()}:{digest}"
+
+    def results(self):
+        if self._results_cache is not None:
+            return self._results_cache
+
+        cache_key = self.get_cache_key()
+        page_ids = cache.get(cache_key)
+
+        if page_ids is None:
+            results = list(self.search_results[self.start : self.stop])
+            cache.set(cache_key, [page.pk for page in results], CACHE_TIMEOUT)
+        else:
+            # Filtering on live guards against pages that were deleted or
+            # unpublished without the cache being invalidated
+            pages = Page.objects.live().specific().in_bulk(page_ids)
+            results = [pages[pk] for pk in page_ids if pk in pages]
+
+        self._results_cache = results
+        return results
+
+    def count(self):
+        return cache.get_or_set(
+            self.get_cache_key("count"),
+            lambda: self.search_results[self.start : self.stop].count(),
+            CACHE_TIMEOUT,
+        )
+
+    def get_or_set(self, name, default):
+        """
+        Returns something else worked out from all the search results, e.g.
+        their facet counts, cached the same way as the results. `default` is
+        called with the search results on a cache miss.
+        """
+        return cache.get_or_set(
+            self.get_cache_key(name),
+            lambda: default(self.search_results[self.start : self.stop]),
+            CACHE_TIMEOUT,
+        )
+
+    def __iter__(self):
+        return iter(self.results())
+
+    def __len__(self):
+        return len(self.results())
@@ -0,0 +1,77 @@
+import csv
+import json
+from collections.abc import Callable
+from dataclasses import dataclass
+
+# The number of results read from the database at a time
+CHUNK_SIZE = 2000
+
+FIELDS = ["id", "title", "url", "type"]
+
+
+def iterate_search_results(search_results):
+    """
+    Yields every search result without loading them all into memory.
+
+    The database backends expose the underlying queryset, which is streamed
+    with a server-side cursor where the database supports it. Other backends,
+    like Elasticsearch, are read a chunk at a time.
+    """
+    if hasattr(search_results, "get_queryset"):
+        yield from search_results.get_queryset().iterator(chunk_size=CHUNK_SIZE)
+        return
+
+    start = 0
+    while True:
+        chunk = list(search_results[start : start + CHUNK_SIZE])
+        yield from chunk
+        if len(chunk) < CHUNK_SIZE:
+            return
+        start += CHUNK_SIZE
+
+
+def serialise(request, page):
+    # The content type is read from Wagtail's cache, so this doesn't query the
+    # database for each page
+    return {
+        "id": page.pk,
+        "title": page.title,
+        "url": page.get_full_url(request),
+        "type": page.specific_class._meta.verbose_name,
+    }
+
+
+class Echo:
+    """
+    A file-like object that returns what is written to it, so that a CSV
+    writer can produce rows for a streaming response.
+    https://docs.djangoproject.com/en/stable/howto/outputting-csv/#streaming-large-csv-files
+    """
+
+    def write(self, value):
+        return value
+
+
+def stream_csv(request, pages):
+    writer = csv.DictWriter(Echo(), fieldnames=FIELDS)
+    yield writer.writeheader()
+    for page in pages:
+        yield writer.writerow(serialise(request, page))
+
+
+def stream_ndjson(request, pages):
+    for page in pages:
+        yield json.dumps(serialise(request, page)) + "\n"
+
+
+@dataclass(frozen=True)
+class ExportFormat:
+    content_type: str
+    extension: str
+    stream: Callable
+
+
+EXPORT_FORMATS = {
+    "csv": ExportFormat("text/csv", "csv", stream_csv),
+    "ndjson": ExportFormat("application/x-ndjson", "ndjson", stream_ndjson),
+}
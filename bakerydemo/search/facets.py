@@ -0,0 +1,175 @@
+from dataclasses import dataclass
+
+from django.db import transaction
+from django.db.models import Count
+from django_tasks import task
+
+from bakerydemo.blog.models import BlogPage
+from bakerydemo.breads.models import BreadPage
+
+from . import cache
+from .models import PageFacetValue
+
+# With search backends that don't expose their results as a queryset, e.g.
+# Elasticsearch, facet values are only counted among this many of the most
+# relevant results, rather than reading the IDs of every result
+MAX_FACETED_RESULTS = 1000
+
+
+@dataclass(frozen=True)
+class Facet:
+    """
+    A field of a page type that search results can be filtered by. `name` is
+    used as the query string parameter, and `field` is the page model's
+    foreign key, many-to-many field or tag manager.
+    """
+
+    name: str
+    label: str
+    model: type
+    field: str
+    label_field: str
+
+    def get_page_values(self, page_ids=None):
+        """
+        Returns the ID, value and value label of each live page with the
+        facet, or of the given pages only. This is only run when refreshing
+        the stored facet values.
+        """
+        pages = self.model.objects.live().filter(**{f"{self.field}__isnull": False})
+        if page_ids is not None:
+            pages = pages.filter(pk__in=page_ids)
+        return (
+            pages.values_list("pk", self.field, self.label_field).order_by().distinct()
+        )
+
+    def filter_pages(self, value):
+        """Returns a subquery of the IDs of live pages with the value."""
+        return self.model.objects.live().filter(**{self.field: value}).values("pk")
+
+
+FACETS = [
+    Facet("origin", "Origin", BreadPage, "origin", "origin__title"),
+    Facet("bread_type", "Bread type", BreadPage, "bread_type", "bread_type__title"),
+    Facet("ingredient", "Ingredient", BreadPage, "ingredients", "ingredients__name"),
+    Facet("tag", "Blog tag", BlogPage, "tags", "tags__name"),
+]
+
+
+def get_facets_for_model(model):
+    return [facet for facet in FACETS if facet.model is model]
+
+
+@task()
+def refresh_facet_values_task(facet_names=None, page_ids=None):
+    """
+    Rebuilds the stored page values of the named facets, or of all facets,
+    for the given pages, e.g. a page that was just published or unpublished,
+    or for every page.
+    """
+    facets = [
+        facet for facet in FACETS if facet_names is None or facet.name in facet_names
+    ]
+    stored_values = PageFacetValue.objects.filter(
+        facet__in=[facet.name for facet in facets]
+    )
+    if page_ids is not None:
+        stored_values = stored_values.filter(page_id__in=page_ids)
+
+    with transaction.atomic():
+        stored_values.delete()
+        PageFacetValue.objects.bulk_create(
+            [
+                PageFacetValue(
+                    page_id=page_id, facet=facet.name, value=value, label=label
+                )
+                for facet in facets
+                for page_id, value, label in facet.get_page_values(page_ids)
+            ]
+        )
+
+    # Cached facet counts may have been counted before the values were
+    # refreshed, as this task can run after the search cache was invalidated
+    cache.invalidate()
+
+
+def get_selected_facets(query_dict):
+    """
+    Returns a dict of facet names to the selected value for each facet in the
+    query string. Values that aren't IDs are ignored.
+    """
+    selected = {}
+    for facet in FACETS:
+        try:
+            selected[facet.name] = int(query_dict[facet.name])
+        except (KeyError, ValueError):
+            continue
+    return selected
+
+
+def filter_search_queryset(queryset, selected_facets):
+    for facet in FACETS:
+        if facet.name in selected_facets:
+            queryset = queryset.filter(
+                pk__in=facet.filter_pages(selected_facets[facet.name])
+            )
+    return queryset
+
+
+def get_page_ids(search_results):
+    """
+    Returns the IDs of the search results to count facet values among. The
+    database backends expose the underlying queryset, so this is a subquery
+    of every result. Other backends, like Elasticsearch, only return the
+    `MAX_FACETED_RESULTS` most relevant results, in one request.
+    """
+    if hasattr(search_results, "get_queryset"):
+        return search_results.get_queryset().values("pk")
+    return [page.pk for page in search_results[:MAX_FACETED_RESULTS]]
+
+
+def count_facet_values(search_results):
+    """
+    Returns the number of search results with each facet value, as a dict of
+    facet names to `(value, label, count)` tuples, the most common first. This
+    is a single query, which only groups the stored values of the results.
+    """
+    counts = {}
+    for facet, value, label, count in (
+        PageFacetValue.objects.filter(page_id__in=get_page_ids(search_results))
+        .values_list("facet", "value", "label")
+        .annotate(count=Count("page_id"))
+        .order_by("facet", "-count", "label")
+    ):
+        counts.setdefault(facet, []).append((value, label, count))
+    return counts
+
+
+def get_facet_counts(query_dict, selected_facets, counts):
+    """
+    Returns each facet, with its values and their counts among the search
+    results, for the search page. Each value has a URL that toggles it in the
+    current search. Values that none of the results have aren't included.
+    """
+    facets = []
+    for facet in FACETS:
+        values = []
+        for value, label, count in counts.get(facet.name, []):
+            params = query_dict.copy()
+            params.pop("page", None)
+            selected = selected_facets.get(facet.name) == value
+            if selected:
+                params.pop(facet.name, None)
+            else:
+                params[facet.name] = value
+            values.append(
+                {
+                    "label": label,
+                    "count": count,
+                    "selected": selected,
+                    "url": f"?{params.urlencode()}",
+                }
+            )
+        if values:
+            facets.append({"name": facet.name, "label": facet.label, "values": values})
+    return facets
@@ -0,0 +1,129 @@
+import atexit
+import logging
+import os
+import threading
+import time
+from collections import Counter
+
+from django.conf import settings
+from django.db import close_old_connections, models, transaction
+from django.utils import timezone
+from django_tasks import task
+from wagtail.contrib.search_promotions.models import Query, QueryDailyHits
+from wagtail.search.utils import normalise_query_string
+
+logger = logging.getLogger(__name__)
+
+
+@task()
+def record_search_hits_task(hits):
+    """
+    Writes buffered search hits to the search promotions tables, given as
+    a list of `[query_string, iso_date, count]`. This makes one write per
+    query per day, however many times the query was searched for.
+    """
+    query_strings = {query_string for query_string, _, _ in hits}
+
+    with transaction.atomic():
+        # `bulk_create` skips `Query.save`, but the query strings were
+        # normalised when they were buffered
+        Query.objects.bulk_create(
+            [Query(query_string=query_string) for query_string in query_strings],
+            ignore_conflicts=True,
+        )
+        query_ids = dict(
+            Query.objects.filter(query_string__in=query_strings).values_list(
+                "query_string", "pk"
+            )
+        )
+
+        QueryDailyHits.objects.bulk_create(
+            [
+                QueryDailyHits(query_id=query_ids[query_string], date=date, hits=0)
+                for query_string, date, _ in hits
+            ],
+            ignore_conflicts=True,
+        )
+        for query_string, date, count in hits:
+            QueryDailyHits.objects.filter(
+                query_id=query_ids[query_string], date=date
+            ).update(hits=models.F("hits") + count)
+
+
+class SearchHitBuffer:
+    """
+    Aggregates search hits in memory per (query, date), so that recording a
+    hit on the request thread doesn't touch the database. Hits are written in
+    bulk by `flush`, which a daemon thread calls every `flush_interval`
+    seconds, and once more when the process exits.
+
+    With no `flush_interval`, nothing is flushed automatically and `flush`
+    has to be called explicitly, e.g. in tests.
+    """
+
+    def __init__(self, flush_interval=None):
+        self.flush_interval = flush_interval
+        self._hits = Counter()
+        self._lock = threading.Lock()
+        self._flusher_pid = None
+
+    def add_hit(self, query_string, date=None):
+        if date is None:
+            date = timezone.now().date()
+        key = (normalise_query_string(query_string), date.isoformat())
+
+        with self._lock:
+            self._hits[key] += 1
+
+        self._start_flusher()
+
+    def drain(self):
+        """Empties the buffer, returning the hits that were in it."""
+        with self._lock:
+            hits, self._hits = self._hits, Counter()
+        return [
+            [query_string, date, count] for (query_string, date), count in hits.items()
+        ]
+
+    def flush(self):
+        hits = self.drain()
+        if hits:
+            record_search_hits_task.enqueue(hits)
+
+    def _start_flusher(self):
+        # Checking the process ID means each forked uwsgi worker gets its own
+        # flusher, as threads don't survive a fork
+        if not self.flush_interval or self._flusher_pid == os.getpid():
+            return
+
+        with self._lock:
+            if self._flusher_pid == os.getpid():
+                return
+            self._flusher_pid = os.getpid()
+
+        threading.Thread(target=self._run_flusher, daemon=True).start()
+        atexit.register(self.flush)
+
+    def _flush_in_background(self):
+        # The flusher thread isn't a request, so Django doesn't close its
+        # database connection when it's stale or broken, e.g. after the
+        # database restarted. Closing it here means the next flush reconnects.
+        close_old_connections()
+        try:
+            self.flush()
+        except Exception:
+            # Search hits are only analytics, so drop this batch rather than
+            # letting the flusher thread die
+            logger.exception("Failed to record search hits")
+        finally:
+            close_old_connections()
+
+    def _run_flusher(self):
+        while True:
+            time.sleep(self.flush_interval)
+            self._flush_in_background()
+
+
+search_hits = SearchHitBuffer(
+    flush_interval=getattr(settings, "SEARCH_HITS_FLUSH_INTERVAL", 10)
+)
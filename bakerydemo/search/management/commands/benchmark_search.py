@@ -0,0 +1,184 @@
+import json
+import statistics
+import time
+import tracemalloc
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from bakerydemo.search.facets import count_facet_values
+from bakerydemo.search.pagination import SearchResultsPaginator
+from bakerydemo.search.views import get_search_results, prefetch_images
+
+# Searches for the demo content, plus words that appear in the pages created
+# by create_random_data
+DEFAULT_QUERIES = [
+    "bread",
+    "sourdough",
+    "rye",
+    "yeast",
+    "gluten free",
+    "banana bread",
+    "flatbread",
+    "baking soda",
+    "chocolate",
+    "cinnamon",
+    "bakery",
+    "recipe",
+    "lorem",
+    "ipsum dolor",
+    "consectetur adipisicing",
+    "nonexistentword",
+]
+
+
+class Command(BaseCommand):
+    help = (
+        "Replays a set of search queries against each configured search "
+        "backend and reports latency, database queries and facet values per "
+        "request and peak memory as JSON. Each request runs the search, counts its facet "
+        "values and fetches the first page of results with their images, "
+        "without the result cache. Search promotions and template rendering "
+        "aren't included."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--backend",
+            action="append",
+            dest="backends",
+            help="A WAGTAILSEARCH_BACKENDS alias to benchmark. Can be given "
+            "more than once. Defaults to all configured backends.",
+        )
+        parser.add_argument(
+            "--queries",
+            type=Path,
+            help="A file of search queries, one per line, to use instead of "
+            "the built-in ones",
+        )
+        parser.add_argument(
+            "--repeat",
+            type=int,
+            default=5,
+            help="How many times to replay each query",
+        )
+        parser.add_argument(
+            "--seed",
+            type=int,
+            metavar="PAGE_COUNT",
+            help="Create this many random pages of each type (with a tenth as "
+            "many snippets and images) with create_random_data first",
+        )
+        parser.add_argument(
+            "--output",
+            type=Path,
+            help="Write the JSON report to this file instead of stdout",
+        )
+
+    def get_queries(self, path):
+        if path is None:
+            return DEFAULT_QUERIES
+        queries = [line.strip() for line in path.read_text().splitlines()]
+        return [query for query in queries if query]
+
+    def run_search(self, search_query, backend):
+        """
+        Runs a search the way the search view does, for the first page of
+        results and the facet counts, but without the result cache. Returns
+        the number of facet values that were counted.
+        """
+        search_results = get_search_results(search_query, backend=backend)
+        facet_counts = count_facet_values(search_results)
+        paginator = SearchResultsPaginator(search_results, 10)
+        page = paginator.page(1)
+        prefetch_images(page)
+        return sum(len(values) for values in facet_counts.values())
+
+    def benchmark(self, backend, queries, repeat):
+        latencies = []
+        query_counts = []
+        facet_value_counts = []
+
+        # Warm up caches, e.g. content types, so they don't skew the results
+        self.run_search(queries[0], backend)
+
+        for _ in range(repeat):
+            for search_query in queries:
+                with CaptureQueriesContext(connection) as captured:
+                    start = time.perf_counter()
+                    facet_value_count = self.run_search(search_query, backend)
+                    latencies.append((time.perf_counter() - start) * 1000)
+                query_counts.append(len(captured.captured_queries))
+                facet_value_counts.append(facet_value_count)
+
+        # Tracing allocations slows them down, so memory is measured in a
+        # separate run of each query rather than while timing them
+        tracemalloc.start()
+        for search_query in queries:
+            self.run_search(search_query, backend)
+        _, peak_memory = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        if len(latencies) > 1:
+            percentiles = statistics.quantiles(latencies, n=100, method="inclusive")
+        else:
+            percentiles = latencies * 99
+        return {
+            "backend": settings.WAGTAILSEARCH_BACKENDS[backend]["BACKEND"],
+            "requests": len(latencies),
+            "latency_ms": {
+                "p50": round(percentiles[49], 3),
+                "p95": round(percentiles[94], 3),
+                "p99": round(percentiles[98], 3),
+                "max": round(max(latencies), 3),
+            },
+            "queries_per_request": {
+                "mean": round(statistics.mean(query_counts), 2),
+                "max": max(query_counts),
+            },
+            "facet_values_per_request": {
+                "mean": round(statistics.mean(facet_value_counts), 2),
+                "max": max(facet_value_counts),
+            },
+            "peak_memory_bytes": peak_memory,
+        }
+
+    def handle(self, **options):
+        backends = options["backends"] or list(settings.WAGTAILSEARCH_BACKENDS)
+        for backend in backends:
+            if backend not in settings.WAGTAILSEARCH_BACKENDS:
+                raise CommandError(f"Search backend '{backend}' is not configured.")
+
+        queries = self.get_queries(options["queries"])
+        if not queries:
+            raise CommandError("There are no queries to run.")
+
+        if options["seed"]:
+            page_count = options["seed"]
+            call_command(
+                "create_random_data",
+                page_count,
+                max(page_count // 10, 1),
+                max(page_count // 10, 1),
+                stdout=self.stderr,
+            )
+            call_command("update_index", verbosity=0)
+
+        report = {
+            "queries": len(queries),
+            "repeat": options["repeat"],
+            "backends": {
+                backend: self.benchmark(backend, queries, options["repeat"])
+                for backend in backends
+            },
+        }
+
+        output = json.dumps(report, indent=2)
+        if options["output"]:
+            options["output"].write_text(output + "\n")
+        else:
+            self.stdout.write(output)
@@ -0,0 +1,10 @@
+from django.core.management.base import BaseCommand
+
+from bakerydemo.search.facets import refresh_facet_values_task
+
+
+class Command(BaseCommand):
+    help = "Rebuilds the stored search facet values of the live pages."
+
+    def handle(self, **options):
+        refresh_facet_values_task.call()
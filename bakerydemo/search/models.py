@@ -0,0 +1,28 @@
+from django.db import models
+
+
+class PageFacetValue(models.Model):
+    """
+    A value of a search facet for a live page, e.g. the country a bread comes
+    from. Search results are counted per facet value by grouping the rows of
+    the matching pages, in one query across all facets, rather than by joining
+    each page type's tables on every search. This table is refreshed when
+    pages are published or unpublished. See bakerydemo/search/facets.py
+    """
+
+    page = models.ForeignKey(
+        "wagtailcore.Page", on_delete=models.CASCADE, related_name="+"
+    )
+    facet = models.CharField(max_length=50)
+    value = models.PositiveIntegerField(help_text="The primary key of the value")
+    label = models.CharField(max_length=255)
+
+    def __str__(self):
+        return f"{self.facet}: {self.label}"
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["page", "facet", "value"], name="unique_page_facet_value"
+            ),
+        ]
@@ -0,0 +1,120 @@
+from collections.abc import Sequence
+from math import ceil
+
+from django.utils.functional import cached_property
+
+
+class SearchResultsPaginator:
+    """
+    A paginator for search results that avoids Django's `Paginator`, which
+    runs an exact `COUNT` over the whole result set before fetching a page.
+
+    Each page fetches `per_page + 1` rows so the extra row tells us whether
+    there is a next page. The total is only counted when there is a next page,
+    and even then the count is capped at `max_count` so that broad queries
+    report e.g. "1,000+ results" rather than counting every match.
+    """
+
+    def __init__(self, object_list, per_page, max_count=1000):
+        self.object_list = object_list
+        self.per_page = per_page
+        self.max_count = max_count
+
+    @property
+    def num_pages(self):
+        """The deepest page that can be requested."""
+        return max(ceil(self.max_count / self.per_page), 1)
+
+    @cached_property
+    def count(self):
+        """
+        The number of results, counting at most `max_count + 1` rows so that
+        callers can tell when the count has been capped.
+        """
+        return self.object_list[: self.max_count + 1].count()
+
+    def validate_number(self, number):
+        """
+        Clamp the requested page number to the pages that can be served. This
+        doesn't touch the database, so it can run before the search query.
+        """
+        try:
+            number = int(number)
+        except (TypeError, ValueError):
+            return 1
+        return min(max(number, 1), self.num_pages)
+
+    def page(self, number):
+        number = self.validate_number(number)
+        bottom = (number - 1) * self.per_page
+        results = list(self.object_list[bottom : bottom + self.per_page + 1])
+
+        if not results and number > 1:
+            # The requested page is past the end of the results, so serve the
+            # last page instead. This is the only case where we need the
+            # count before rendering.
+            last_page = max(ceil(min(self.count, self.max_count) / self.per_page), 1)
+            return self.page(min(last_page, number - 1))
+
+        return SearchResultsPage(
+            results[: self.per_page],
+            number,
+            self,
+            has_next=len(results) > self.per_page,
+        )
+
+
+class SearchResultsPage(Sequence):
+    """
+    A page of search results, mirroring the parts of Django's `Page` API that
+    templates use, plus a count that may have been capped by the paginator.
+    """
+
+    def __init__(self, object_list, number, paginator, has_next):
+        self.object_list = object_list
+        self.number = number
+        self.paginator = paginator
+        self._has_next = has_next
+
+    def __repr__(self):
+        return f"<Page {self.number}>"
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self):
+        return self._has_next
+
+    def has_previous(self):
+        return self.number > 1
+
+    def has_other_pages(self):
+        return self.has_previous() or self.has_next()
+
+    def next_page_number(self):
+        return self.number + 1
+
+    def previous_page_number(self):
+        return self.number - 1
+
+    def start_index(self):
+        return (self.number - 1) * self.paginator.per_page + 1
+
+    @cached_property
+    def _count(self):
+        if not self.has_next():
+            # This is the last page, so the count is known without a query
+            return self.start_index() - 1 + len(self)
+        return self.paginator.count
+
+    @property
+    def count(self):
+        """The total number of results, capped at the paginator's `max_count`."""
+        return min(self._count, self.paginator.max_count)
+
+    @property
+    def count_is_capped(self):
+        return self._count > self.paginator.max_count
@@ -0,0 +1,52 @@
+from django.db.models.signals import post_delete, post_save
+from wagtail.signals import page_published, page_unpublished
+
+from . import cache
+from .facets import FACETS, get_facets_for_model, refresh_facet_values_task
+from .models import PageFacetValue
+
+
+def invalidate_search_results(**kwargs):
+    cache.invalidate()
+
+
+def refresh_page_facets(sender, instance, **kwargs):
+    # Only the published or unpublished page's values change
+    refresh_facet_values_task.enqueue(
+        [facet.name for facet in get_facets_for_model(sender)], [instance.pk]
+    )
+
+
+def refresh_value_facets(sender, instance, **kwargs):
+    # A facet value, e.g. a country, was edited or deleted, so its label may
+    # have changed, or it may no longer apply to pages. Only the pages it's
+    # stored for are affected. A new value has none, and is stored when a
+    # page with it is published.
+    facet_names = [
+        facet.name
+        for facet in FACETS
+        if facet.model._meta.get_field(facet.field).related_model is sender
+    ]
+    page_ids = list(
+        PageFacetValue.objects.filter(facet__in=facet_names, value=instance.pk)
+        .values_list("page_id", flat=True)
+        .distinct()
+    )
+    if page_ids:
+        refresh_facet_values_task.enqueue(facet_names, page_ids)
+
+
+def register_signal_handlers():
+    from .views import SEARCHABLE_PAGE_TYPES
+
+    for model in SEARCHABLE_PAGE_TYPES:
+        page_published.connect(invalidate_search_results, sender=model)
+        page_unpublished.connect(invalidate_search_results, sender=model)
+
+    for facet in FACETS:
+        page_published.connect(refresh_page_facets, sender=facet.model)
+        page_unpublished.connect(refresh_page_facets, sender=facet.model)
+
+        value_model = facet.model._meta.get_field(facet.field).related_model
+        post_save.connect(refresh_value_facets, sender=value_model)
+        post_delete.connect(refresh_value_facets, sender=value_model)
@@ -0,0 +1,42 @@
+import json
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+from wagtail.models import Page
+
+from bakerydemo.breads.models import BreadPage, BreadsIndexPage, Country
+from bakerydemo.search.facets import refresh_facet_values_task
+
+
+class BenchmarkSearchTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        root = Page.get_first_root_node()
+        breads_index = root.add_child(
+            instance=BreadsIndexPage(title="Breads", slug="breads")
+        )
+        breads_index.add_child(
+            instance=BreadPage(
+                title="Country loaf",
+                slug="country-loaf",
+                introduction="A sourdough",
+                origin=Country.objects.create(title="France"),
+            )
+        )
+        refresh_facet_values_task.call()
+
+    def test_report(self):
+        stdout = StringIO()
+
+        call_command("benchmark_search", backends=["default"], repeat=2, stdout=stdout)
+
+        report = json.loads(stdout.getvalue())
+        self.assertEqual(report["repeat"], 2)
+        result = report["backends"]["default"]
+        self.assertEqual(result["requests"], report["queries"] * 2)
+        self.assertEqual(set(result["latency_ms"]), {"p50", "p95", "p99", "max"})
+        self.assertGreater(result["queries_per_request"]["max"], 0)
+        # Only "sourdough" matches the bread, which has one origin
+        self.assertEqual(result["facet_values_per_request"]["max"], 1)
+        self.assertGreater(result["peak_memory_bytes"], 0)
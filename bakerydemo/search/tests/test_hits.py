@@ -0,0 +1,21 @@
+import threading
+
+from django.test import SimpleTestCase
+
+from bakerydemo.search.hits import SearchHitBuffer
+
+
+class FailingSearchHitBuffer(SearchHitBuffer):
+    def flush(self):
+        raise RuntimeError("The task backend is down")
+
+
+class SearchHitBufferTest(SimpleTestCase):
+    def test_flusher_survives_failures(self):
+        search_hits = FailingSearchHitBuffer()
+
+        # Run as the flusher thread would, with its own database connections
+        flusher = threading.Thread(target=search_hits._flush_in_background)
+        with self.assertLogs("bakerydemo.search.hits", "ERROR"):
+            flusher.start()
+            flusher.join()
@@ -0,0 +1,53 @@
+from django.test import TestCase
+from wagtail.models import Page
+
+from bakerydemo.search.pagination import SearchResultsPaginator
+
+
+class SearchResultsPaginatorTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        root = Page.get_first_root_node()
+        for i in range(7):
+            root.add_child(instance=Page(title=f"Page {i}", slug=f"page-{i}"))
+        # Eight pages in total, including the default Wagtail welcome page
+        cls.pages = Page.objects.filter(depth=2).order_by("pk")
+
+    def test_validate_number(self):
+        paginator = SearchResultsPaginator(self.pages, 2, max_count=5)
+
+        with self.assertNumQueries(0):
+            self.assertEqual(paginator.validate_number("2"), 2)
+            self.assertEqual(paginator.validate_number("abc"), 1)
+            self.assertEqual(paginator.validate_number(None), 1)
+            self.assertEqual(paginator.validate_number("-1"), 1)
+            # max_count=5 with 2 per page allows at most 3 pages
+            self.assertEqual(paginator.validate_number("100"), 3)
+
+    def test_last_page_is_counted_without_a_query(self):
+        paginator = SearchResultsPaginator(self.pages, 5)
+
+        with self.assertNumQueries(1):
+            page = paginator.page(2)
+            self.assertFalse(page.has_next())
+            self.assertTrue(page.has_previous())
+            self.assertEqual(page.count, 8)
+            self.assertFalse(page.count_is_capped)
+
+    def test_count_is_capped(self):
+        paginator = SearchResultsPaginator(self.pages, 2, max_count=5)
+
+        with self.assertNumQueries(2):
+            page = paginator.page(1)
+            self.assertEqual(len(page), 2)
+            self.assertTrue(page.has_next())
+            self.assertEqual(page.count, 5)
+            self.assertTrue(page.count_is_capped)
+
+    def test_page_past_the_end_serves_last_page(self):
+        paginator = SearchResultsPaginator(self.pages, 5, max_count=100)
+
+        page = paginator.page(4)
+
+        self.assertEqual(page.number, 2)
+        self.assertEqual(len(page), 3)
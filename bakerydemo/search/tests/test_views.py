@@ -0,0 +1,320 @@
+import json
+
+from django.contrib.auth.models import User
+from django.contrib.contenttypes.models import ContentType
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from modelsearch.backends.elasticsearchbase import (
+    ElasticsearchBaseSearchQueryCompiler,
+)
+from wagtail.contrib.search_promotions.models import Query, QueryDailyHits
+from wagtail.models import Page, Site
+from wagtail.test.utils import WagtailPageTestCase
+
+from bakerydemo.base.models import HomePage, Person, StandardPage
+from bakerydemo.blog.models import BlogIndexPage, BlogPage
+from bakerydemo.breads.models import BreadPage, BreadsIndexPage, Country
+from bakerydemo.search import facets
+from bakerydemo.search.facets import get_page_ids, refresh_facet_values_task
+from bakerydemo.search.hits import search_hits
+from bakerydemo.search.models import PageFacetValue
+from bakerydemo.search.views import SEARCHABLE_PAGE_TYPES, get_search_results
+
+
+class SearchViewTest(WagtailPageTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        root = Page.get_first_root_node()
+        Site.objects.create(hostname="testserver", root_page=root, is_default_site=True)
+
+        cls.home = root.add_child(
+            instance=HomePage(
+                title="Home", slug="test-home", hero_text="Hi", hero_cta="Go"
+            )
+        )
+        breads_index = cls.home.add_child(
+            instance=BreadsIndexPage(title="Breads", slug="breads")
+        )
+        blog_index = cls.home.add_child(
+            instance=BlogIndexPage(title="Blog", slug="blog")
+        )
+
+        cls.france = Country.objects.create(title="France")
+        cls.bread = breads_index.add_child(
+            instance=BreadPage(
+                title="Country loaf",
+                slug="country-loaf",
+                introduction="A sourdough",
+                origin=cls.france,
+            )
+        )
+        cls.post = blog_index.add_child(
+            instance=BlogPage(
+                title="Sourdough starters", slug="sourdough-starters", subtitle="Hi"
+            )
+        )
+        # Matches the query, but isn't one of the searchable page types
+        cls.home.add_child(
+            instance=StandardPage(
+                title="About", slug="about", introduction="We love sourdough"
+            )
+        )
+        Person.objects.create(
+            first_name="Sourdough", last_name="Sam", job_title="Baker", live=True
+        )
+        Person.objects.create(
+            first_name="Sourdough", last_name="Sue", job_title="Baker", live=False
+        )
+        # Matches the query, but isn't live
+        breads_index.add_child(
+            instance=BreadPage(title="Sourdough rye", slug="sourdough-rye", live=False)
+        )
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+
+    def search(self, **params):
+        return self.client.get(reverse("search"), params)
+
+    def test_search_matches_specific_fields_across_page_types(self):
+        response = self.search(q="sourdough")
+
+        self.assertEqual(response.status_code, 200)
+        results = list(response.context["search_results"])
+        self.assertCountEqual(
+            [result.pk for result in results], [self.bread.pk, self.post.pk]
+        )
+
+    def test_search_results_are_specific(self):
+        response = self.search(q="sourdough")
+
+        with self.assertNumQueries(0):
+            results = list(response.context["search_results"])
+            self.assertCountEqual(
+                [type(result) for result in results], [BreadPage, BlogPage]
+            )
+            for result in results:
+                self.assertIs(result.specific, result)
+                self.assertIsNone(result.image)
+
+    def test_search_without_query(self):
+        response = self.search()
+
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "You didn&apos;t search for anything!")
+
+    def test_search_hits_are_buffered(self):
+        search_hits.drain()
+
+        self.search(q="Sourdough")
+        self.search(q="  sourdough ")
+        self.search(q="rye")
+
+        # Nothing is written on the request thread
+        self.assertFalse(Query.objects.exists())
+
+        with self.assertNumQueries(7):
+            search_hits.flush()
+
+        daily_hits = QueryDailyHits.objects.filter(query__query_string="sourdough")
+        self.assertEqual([hit.hits for hit in daily_hits], [2])
+        self.assertEqual(Query.get("rye").hits, 1)
+
+    def test_search_results_are_cached(self):
+        self.search(q="sourdough")
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.search(q="Sourdough")
+
+        self.assertCountEqual(
+            [type(result) for result in response.context["search_results"]],
+            [BreadPage, BlogPage],
+        )
+        self.assertFalse(
+            any("wagtailsearch" in query["sql"] for query in queries.captured_queries)
+        )
+
+    def test_publishing_invalidates_cached_search_results(self):
+        response = self.search(q="sourdough")
+        self.assertEqual(len(response.context["search_results"]), 2)
+
+        rye = BreadPage.objects.get(slug="sourdough-rye")
+        rye.save_revision().publish()
+
+        response = self.search(q="sourdough")
+        self.assertEqual(len(response.context["search_results"]), 3)
+
+    def test_autocomplete(self):
+        response = self.client.get(reverse("search_autocomplete"), {"q": "Sour"})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            response.json()["results"],
+            [
+                {
+                    "type": "page",
+                    "title": "Sourdough starters",
+                    "url": "/test-home/blog/sourdough-starters/",
+                },
+                {"type": "person", "title": "Sourdough Sam", "url": None},
+            ],
+        )
+
+        # The response for the same query is cached
+        with self.assertNumQueries(0):
+            self.client.get(reverse("search_autocomplete"), {"q": "sour"})
+
+    def test_facets(self):
+        refresh_facet_values_task.call()
+
+        response = self.search(q="sourdough")
+
+        self.assertEqual(
+            response.context["facets"],
+            [
+                {
+                    "name": "origin",
+                    "label": "Origin",
+                    "values": [
+                        {
+                            "label": "France",
+                            "count": 1,
+                            "selected": False,
+                            "url": f"?q=sourdough&origin={self.france.pk}",
+                        }
+                    ],
+                }
+            ],
+        )
+
+        response = self.search(q="sourdough", origin=self.france.pk)
+
+        self.assertEqual(list(response.context["search_results"]), [self.bread])
+        self.assertTrue(response.context["facets"][0]["values"][0]["selected"])
+
+    def test_elasticsearch_filters_in_the_index(self):
+        refresh_facet_values_task.call()
+        search_results = get_search_results("sourdough", {"origin": self.france.pk})
+
+        # Compiled without a connection, as the view would send it
+        compiler = ElasticsearchBaseSearchQueryCompiler(
+            search_results.query_compiler.queryset, "sourdough"
+        )
+        compiler.check()
+        filters = compiler.get_query()["bool"]["filter"][1]["bool"]["must"]
+
+        self.assertIn({"term": {"live_filter": True}}, filters)
+        self.assertCountEqual(
+            filters[1]["terms"]["content_type_id_filter"],
+            [
+                ContentType.objects.get_for_model(model).pk
+                for model in SEARCHABLE_PAGE_TYPES
+            ],
+        )
+        self.assertEqual(filters[2], {"terms": {"id_filter": [self.bread.pk]}})
+
+    def test_facets_only_count_the_search_results(self):
+        refresh_facet_values_task.call()
+
+        # The bread from France doesn't match the query
+        response = self.search(q="starters")
+
+        self.assertEqual(list(response.context["search_results"]), [self.post])
+        self.assertEqual(response.context["facets"], [])
+
+    def test_facet_counts_are_cached_with_the_results(self):
+        refresh_facet_values_task.call()
+        self.search(q="sourdough")
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.search(q="sourdough")
+
+        self.assertEqual(response.context["facets"][0]["values"][0]["count"], 1)
+        self.assertFalse(
+            [query for query in queries if "search_pagefacetvalue" in query["sql"]]
+        )
+
+    def test_facets_are_counted_among_the_most_relevant_results(self):
+        # Search backends other than the database ones only return results
+        # lists, rather than a queryset
+        results = [self.post, self.bread]
+
+        self.assertEqual(get_page_ids(results), [self.post.pk, self.bread.pk])
+
+        max_results, facets.MAX_FACETED_RESULTS = facets.MAX_FACETED_RESULTS, 1
+        try:
+            self.assertEqual(get_page_ids(results), [self.post.pk])
+        finally:
+            facets.MAX_FACETED_RESULTS = max_results
+
+    def test_publishing_refreshes_facet_counts(self):
+        refresh_facet_values_task.call()
+        rye = BreadPage.objects.get(slug="sourdough-rye")
+        rye.origin = self.france
+        rye.save_revision().publish()
+
+        response = self.search(q="sourdough")
+
+        self.assertEqual(response.context["facets"][0]["values"][0]["count"], 2)
+
+    def test_editing_a_facet_value_refreshes_its_pages(self):
+        refresh_facet_values_task.call()
+
+        self.france.title = "République française"
+        self.france.save()
+
+        self.assertEqual(
+            PageFacetValue.objects.get(page=self.bread).label, "République française"
+        )
+
+    def test_publishing_only_refreshes_the_page_facet_values(self):
+        refresh_facet_values_task.call()
+        stored_value = PageFacetValue.objects.get(page=self.bread)
+
+        rye = BreadPage.objects.get(slug="sourdough-rye")
+        rye.origin = self.france
+        rye.save_revision().publish()
+
+        self.assertTrue(PageFacetValue.objects.filter(pk=stored_value.pk).exists())
+        self.assertTrue(PageFacetValue.objects.filter(page=rye).exists())
+
+        BreadPage.objects.get(pk=rye.pk).unpublish()
+
+        self.assertFalse(PageFacetValue.objects.filter(page=rye).exists())
+
+    def test_export_requires_admin_access(self):
+        response = self.client.get(reverse("search_export"), {"q": "sourdough"})
+
+        self.assertEqual(response.status_code, 403)
+
+    def test_export(self):
+        user = User.objects.create_superuser(username="admin", password="password")
+        self.client.force_login(user)
+
+        response = self.client.get(
+            reverse("search_export"), {"q": "sourdough", "format": "ndjson"}
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], "application/x-ndjson")
+        lines = b"".join(response.streaming_content).decode().splitlines()
+        self.assertCountEqual(
+            [json.loads(line) for line in lines],
+            [
+                {
+                    "id": self.bread.pk,
+                    "title": "Country loaf",
+                    "url": "http://testserver/test-home/breads/country-loaf/",
+                    "type": "bread page",
+                },
+                {
+                    "id": self.post.pk,
+                    "title": "Sourdough starters",
+                    "url": "http://testserver/test-home/blog/sourdough-starters/",
+                    "type": "blog page",
+                },
+            ],
+        )
@@ -1,62 +1,128 @@
-from django.conf import settings
-from django.core.paginator import EmptyPage, PageNotAnInteger, Paginator
+import hashlib
+
+from django.contrib.auth.decorators import permission_required
+from django.core.cache import cache
+from django.http import JsonResponse, StreamingHttpResponse
 from django.shortcuts import render
-from wagtail.contrib.search_promotions.models import Query
+from django.utils.cache import patch_cache_control
+from wagtail.contrib.search_promotions.models import SearchPromotion
+from wagtail.images import get_image_model
 from wagtail.models import Page
+from wagtail.search.backends import get_search_backend
+from wagtail.search.utils import normalise_query_string
 
+from bakerydemo.base.models import Person
 from bakerydemo.blog.models import BlogPage
 from bakerydemo.breads.models import BreadPage
 from bakerydemo.locations.models import LocationPage
 from bakerydemo.recipes.models import RecipePage
 
+from .cache import CachedSearchResults
+from .export import EXPORT_FORMATS, iterate_search_results
+from .facets import (
+    count_facet_values,
+    filter_search_queryset,
+    get_facet_counts,
+    get_selected_facets,
+)
+from .hits import search_hits
+from .pagination import SearchResultsPaginator
+
+# The page types that are shown in search results. The search results template
+# has a label for each of these types.
+SEARCHABLE_PAGE_TYPES = (BlogPage, BreadPage, LocationPage, RecipePage)
+
+# The maximum number of pages, and of people, returned by autocomplete
+AUTOCOMPLETE_LIMIT = 5
+
+# Autocomplete responses are cached briefly, as they're requested on every
+# keystroke and don't need to reflect edits immediately
+AUTOCOMPLETE_CACHE_TIMEOUT = 60
+
+
+def get_search_results(
+    search_query, selected_facets=None, backend="default", specific=True
+):
+    """
+    Returns a lazy, relevance-ordered set of search results across all
+    searchable page types, filtered by any selected facets.
+
+    Both the database and Elasticsearch backends index every search field of
+    the specific page model against the page's index entry, so a single
+    `Page` query restricted to the searchable content types returns the same
+    pages as searching each model separately. The live, page type and facet
+    filters are filter fields on every backend, so Elasticsearch applies them
+    in the index too. The results are only evaluated when sliced, so
+    pagination happens in the search backend. Unless `specific` is False,
+    results are the specific pages, fetched with one query per page type.
+    https://docs.wagtail.org/en/stable/topics/search/searching.html
+    """
+    queryset = Page.objects.live().type(*SEARCHABLE_PAGE_TYPES)
+    if specific:
+        queryset = queryset.specific()
+    queryset = filter_search_queryset(queryset, selected_facets or {})
+    return queryset.search(search_query, order_by_relevance=True, backend=backend)
+
+
+def prefetch_images(pages):
+    """
+    Fetches the images of the given specific pages, and all their renditions,
+    in two queries rather than two per page. Not every page type has an image.
+    """
+    image_ids = {getattr(page, "image_id", None) for page in pages} - {None}
+    images = get_image_model().objects.prefetch_renditions().in_bulk(image_ids)
+    for page in pages:
+        if getattr(page, "image_id", None) in images:
+            page.image = images[page.image_id]
+
 
 def search(request):
     # Search
     search_query = request.GET.get("q", None)
+    selected_facets = get_selected_facets(request.GET)
     if search_query:
-        if "elasticsearch" in settings.WAGTAILSEARCH_BACKENDS["default"]["BACKEND"]:
-            # In production, use ElasticSearch and a simplified search query, per
-            # https://docs.wagtail.org/en/stable/topics/search/backends.html
-            # like this:
-            search_results = Page.objects.live().search(search_query)
-        else:
-            # If we aren't using ElasticSearch for the demo, fall back to native db search.
-            # But native DB search can't search specific fields in our models on a `Page` query.
-            # So for demo purposes ONLY, we hard-code in the model names we want to search.
-            blog_results = BlogPage.objects.live().search(search_query)
-            blog_page_ids = [p.page_ptr.id for p in blog_results]
-
-            bread_results = BreadPage.objects.live().search(search_query)
-            bread_page_ids = [p.page_ptr.id for p in bread_results]
-
-            location_results = LocationPage.objects.live().search(search_query)
-            location_result_ids = [p.page_ptr.id for p in location_results]
-
-            recipe_results = RecipePage.objects.live().search(search_query)
-            recipe_page_ids = [p.page_ptr.id for p in recipe_results]
-
-            page_ids = (
-                blog_page_ids + bread_page_ids + location_result_ids + recipe_page_ids
-            )
-            search_results = Page.objects.live().filter(id__in=page_ids)
+        # Each page of results is cached until a searchable page is published
+        # or unpublished
+        search_results = CachedSearchResults(
+            get_search_results(search_query, selected_facets),
+            search_query,
+            selected_facets,
+        )
+    else:
+        search_results = Page.objects.none()
 
-        query = Query.get(search_query)
+    # Pagination. The search results are lazy, so the page number is validated
+    # before any query runs. Only one page of results (plus one row to detect
+    # the next page) is fetched, and the results are only counted, up to a
+    # cap, when there is a next page.
+    paginator = SearchResultsPaginator(search_results, 10)
+    page = paginator.validate_number(request.GET.get("page", 1))
 
-        # Record hit
-        query.add_hit()
+    if search_query:
+        # Record hit. This only adds to an in-memory buffer, which is written
+        # to the database in bulk in the background.
+        search_hits.add_hit(search_query)
 
+        # Unlike the `get_search_promotions` template tag, this doesn't create
+        # a `Query` for the search. It's only evaluated if there are no results.
+        search_promotions = SearchPromotion.objects.filter(
+            query__query_string=normalise_query_string(search_query)
+        )
+
+        # The facet values are counted among the results, not just this page,
+        # from the values stored for each page, in one query. The counts are
+        # cached with the results.
+        facets = get_facet_counts(
+            request.GET,
+            selected_facets,
+            search_results.get_or_set("facet_counts", count_facet_values),
+        )
     else:
-        search_results = Page.objects.none()
+        search_promotions = SearchPromotion.objects.none()
+        facets = []
 
-    # Pagination
-    page = request.GET.get("page", 1)
-    paginator = Paginator(search_results, 10)
-    try:
-        search_results = paginator.page(page)
-    except PageNotAnInteger:
-        search_results = paginator.page(1)
-    except EmptyPage:
-        search_results = paginator.page(paginator.num_pages)
+    search_results = paginator.page(page)
+    prefetch_images(search_results)
 
     return render(
         request,
@@ -64,5 +130,74 @@ def search(request):
         {
             "search_query": search_query,
             "search_results": search_results,
+            "search_promotions": search_promotions,
+            "facets": facets,
         },
     )
+
+
+def get_autocomplete_results(request, search_query):
+    """
+    Returns the minimal data a search-as-you-type UI needs for the pages whose
+    titles, and the people whose names, start with the query.
+    """
+    pages = (
+        Page.objects.live()
+        .type(*SEARCHABLE_PAGE_TYPES)
+        .autocomplete(search_query)[:AUTOCOMPLETE_LIMIT]
+    )
+    people = get_search_backend().autocomplete(
+        search_query, Person.objects.filter(live=True)
+    )[:AUTOCOMPLETE_LIMIT]
+
+    return [
+        {"type": "page", "title": page.title, "url": page.get_url(request)}
+        for page in pages
+    ] + [{"type": "person", "title": str(person), "url": None} for person in people]
+
+
+def autocomplete(request):
+    search_query = normalise_query_string(request.GET.get("q", ""))
+
+    if search_query:
+        digest = hashlib.md5(search_query.encode()).hexdigest()
+        results = cache.get_or_set(
+            f"search_autocomplete:{request.get_host()}:{digest}",
+            lambda: get_autocomplete_results(request, search_query),
+            AUTOCOMPLETE_CACHE_TIMEOUT,
+        )
+    else:
+        results = []
+
+    response = JsonResponse({"results": results})
+    patch_cache_control(response, public=True, max_age=AUTOCOMPLETE_CACHE_TIMEOUT)
+    return response
+
+
+@permission_required("wagtailadmin.access_admin", raise_exception=True)
+def export(request):
+    """
+    Streams every result of a search, with any selected facets, as CSV or
+    newline-delimited JSON. Results are read from the database in chunks, so
+    memory use doesn't grow with the number of results.
+    """
+    search_query = request.GET.get("q", "")
+    export_format = EXPORT_FORMATS.get(request.GET.get("format"), EXPORT_FORMATS["csv"])
+
+    if search_query:
+        search_results = iterate_search_results(
+            get_search_results(
+                search_query, get_selected_facets(request.GET), specific=False
+            )
+        )
+    else:
+        search_results = []
+
+    response = StreamingHttpResponse(
+        export_format.stream(request, search_results),
+        content_type=export_format.content_type,
+    )
+    response["Content-Disposition"] = (
+        f'attachment; filename="search-results.{export_format.extension}"'
+    )
+    return response
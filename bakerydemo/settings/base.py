@@ -84,6 +84,7 @@ MIDDLEWARE = [
     # Uncomment to enable django-debug-toolbar
     # "debug_toolbar.middleware.DebugToolbarMiddleware",
     "django.middleware.security.SecurityMiddleware",
+    "bakerydemo.base.middleware.SiteMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
@@ -260,6 +261,31 @@ WAGTAILSEARCH_BACKENDS = {
     },
 }
 
+# How often, in seconds, buffered search hits are written to the database.
+# See bakerydemo/search/hits.py
+SEARCH_HITS_FLUSH_INTERVAL = 10
+
+# How often, in seconds, each process checks whether the data it keeps in
+# memory, e.g. the footer text, was changed by another process.
+# See bakerydemo/base/cache.py
+LOCAL_CACHE_CHECK_INTERVAL = 5
+
+# Cache whole pages for anonymous visitors. This is opt-in, as cached pages are
+# only updated when they're purged or expire.
+# See bakerydemo/base/middleware.py
+if os.environ.get("PAGE_CACHE_ENABLED", "false").lower().strip() == "true":
+    MIDDLEWARE.append("bakerydemo.base.middleware.PageCacheMiddleware")
+
+# How long, in seconds, cached pages are kept if they aren't purged
+PAGE_CACHE_TIMEOUT = int(os.environ.get("PAGE_CACHE_TIMEOUT", 10 * 60))
+
+# How often, in seconds, queued frontend cache purges are sent, and how many
+# times, and after how long, failed purges are retried. The delay doubles after
+# each retry. See bakerydemo/base/frontend_cache.py
+FRONTEND_CACHE_PURGE_INTERVAL = 5
+FRONTEND_CACHE_PURGE_RETRIES = 3
+FRONTEND_CACHE_PURGE_BACKOFF = 1
+
 # Wagtail settings
 WAGTAIL_SITE_NAME = "The Wagtail Bakery"
 
@@ -1,3 +1,5 @@
+import os
+
 from .base import *  # noqa: F403
 
 DEBUG = True
@@ -9,6 +11,14 @@ WAGTAILADMIN_BASE_URL = "http://localhost:8000"
 
 ALLOWED_HOSTS = ["*"]
 
+# Purge the frontend cache with a stub backend, which only logs the URLs it's
+# sent, to try out purging offline
+if os.environ.get("FRONTEND_CACHE_STUB_ENABLED", "false").lower().strip() == "true":
+    INSTALLED_APPS.append("wagtail.contrib.frontend_cache")  # noqa: F405
+    WAGTAILFRONTENDCACHE = {
+        "default": {"BACKEND": "bakerydemo.base.frontend_cache.StubBackend"}
+    }
+
 try:
     from .local import *  # noqa
 except ImportError:
@@ -198,7 +198,9 @@ if (
     INSTALLED_APPS.append("wagtail.contrib.frontend_cache")
     WAGTAILFRONTENDCACHE = {
         "default": {
-            "BACKEND": "wagtail.contrib.frontend_cache.backends.CloudflareBackend",
+            # Wagtail's Cloudflare backend, but purging in batches from a
+            # background task. See bakerydemo/base/frontend_cache.py
+            "BACKEND": "bakerydemo.base.frontend_cache.CloudflareBackend",
             "ZONEID": os.environ["FRONTEND_CACHE_CLOUDFLARE_ZONEID"],
         }
     }
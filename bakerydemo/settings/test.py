@@ -33,6 +33,19 @@ TASKS = {
     }
 }
 
+# Record search hits only when the buffer is flushed explicitly, rather than
+# from a background thread
+SEARCH_HITS_FLUSH_INTERVAL = None
+
+# Likewise, send queued frontend cache purges only when the queue is flushed
+# explicitly, and retry them without waiting
+FRONTEND_CACHE_PURGE_INTERVAL = None
+FRONTEND_CACHE_PURGE_BACKOFF = 0
+
+# Check the shared cache on every read, so that clearing it between tests
+# also clears the data kept in memory
+LOCAL_CACHE_CHECK_INTERVAL = 0
+
 # #############
 # Performance
 